@@ -0,0 +1,148 @@
+"""
+This module provides small numerical kernels for the route and map geometry, i.e. the nearest point search,
+the length of a polyline, the bounding box of a point set and the projection of points onto the screen.
+If Numba is installed, the kernels are JIT-compiled into single loops that avoid the temporary arrays NumPy
+allocates. Otherwise, equivalent NumPy implementations are used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional
+    njit = None
+
+
+def _nearest_idx_numpy(points, qx, qy):
+    """
+    Find the point closest to (qx, qy) in the x-y plane.
+
+    Args:
+        points (np.ndarray): The points to search, shape [N, 2] or [N, 3] with N > 0. Only x and y are used.
+        qx, qy (float): The coordinates of the query location.
+
+    Returns:
+        int: The index of the closest point.
+        float: The squared distance to the closest point.
+    """
+    dist2 = (points[:, 0] - qx) ** 2 + (points[:, 1] - qy) ** 2
+    idx = int(dist2.argmin())
+
+    return idx, float(dist2[idx])
+
+
+def _polyline_length_numpy(points):
+    """
+    Compute the length of the polyline through the given points.
+
+    Args:
+        points (np.ndarray): The points of the polyline, shape [N, 3].
+
+    Returns:
+        float: The length of the polyline.
+    """
+    diff = np.diff(points, axis=0)
+
+    return float(np.sqrt((diff**2).sum(axis=1)).sum())
+
+
+def _minmax_numpy(points):
+    """
+    Compute the per-axis minimum and maximum of the given points.
+
+    Args:
+        points (np.ndarray): The points, shape [N, D] with N > 0.
+
+    Returns:
+        np.ndarray: The minimum per axis, shape [D].
+        np.ndarray: The maximum per axis, shape [D].
+    """
+    return points.min(axis=0), points.max(axis=0)
+
+
+def _project_clip_numpy(world, scale, offset_x, offset_y, width, height, out):
+    """
+    Transform world coordinates to screen coordinates and keep the points inside the window. The transform is
+    computed in float64: for large maps at high zoom, world * scale and the offset are large and nearly cancel, which
+    would cost float32 its sub-pixel precision. Only the result is stored as float32.
+
+    Args:
+        world (np.ndarray): The world coordinates, shape [N, 2] or [N, 3]. Only x and y are used.
+        scale (float): The factor from meters to pixels.
+        offset_x, offset_y (float): The screen coordinates of the world origin.
+        width, height (float): The size of the window in pixels.
+        out (np.ndarray): The buffer for the screen coordinates inside the window, shape [N, 2], float32.
+
+    Returns:
+        int: The number of points written to the start of out.
+    """
+    screen = np.multiply(world[:, :2], scale, dtype=np.float64)
+    screen += np.array([offset_x, offset_y])
+
+    inside = (screen[:, 0] >= 0) & (screen[:, 1] >= 0) & (screen[:, 0] <= width) & (screen[:, 1] <= height)
+    count = int(np.count_nonzero(inside))
+    np.compress(inside, screen, axis=0, out=out[:count])
+
+    return count
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def nearest_idx(points, qx, qy):
+        """JIT-compiled version of _nearest_idx_numpy."""
+        best_idx, best_dist2 = -1, np.inf
+        for i in range(points.shape[0]):
+            dx, dy = points[i, 0] - qx, points[i, 1] - qy
+            dist2 = dx * dx + dy * dy
+            if dist2 < best_dist2:
+                best_idx, best_dist2 = i, dist2
+
+        return best_idx, best_dist2
+
+    @njit(cache=True)
+    def polyline_length(points):
+        """JIT-compiled version of _polyline_length_numpy."""
+        length = 0.0
+        for i in range(points.shape[0] - 1):
+            dx = points[i + 1, 0] - points[i, 0]
+            dy = points[i + 1, 1] - points[i, 1]
+            dz = points[i + 1, 2] - points[i, 2]
+            length += np.sqrt(dx * dx + dy * dy + dz * dz)
+
+        return length
+
+    @njit(cache=True)
+    def minmax(points):
+        """JIT-compiled version of _minmax_numpy, which reads the points only once."""
+        mins, maxs = points[0].copy(), points[0].copy()
+        for i in range(1, points.shape[0]):
+            for j in range(points.shape[1]):
+                value = points[i, j]
+                if value < mins[j]:
+                    mins[j] = value
+                elif value > maxs[j]:
+                    maxs[j] = value
+
+        return mins, maxs
+
+    @njit(cache=True)
+    def project_clip(world, scale, offset_x, offset_y, width, height, out):
+        """JIT-compiled version of _project_clip_numpy, which transforms and compacts the points in one pass."""
+        count = 0
+        for i in range(world.shape[0]):
+            # In float64 like the NumPy version, only the result is rounded to float32
+            x = np.float64(world[i, 0]) * scale + offset_x
+            y = np.float64(world[i, 1]) * scale + offset_y
+            if 0 <= x <= width and 0 <= y <= height:
+                out[count, 0] = x
+                out[count, 1] = y
+                count += 1
+
+        return count
+
+else:
+    nearest_idx = _nearest_idx_numpy
+    polyline_length = _polyline_length_numpy
+    minmax = _minmax_numpy
+    project_clip = _project_clip_numpy
@@ -5,9 +5,130 @@ methods for adding or removing waypoints, adding or removing scenarios, interpol
 between route waypoints, and generating scenario XML elements.
 """
 
+import collections
+import functools
+
 import carla
 import numpy as np
 from lxml import etree
+from scipy.spatial import cKDTree
+from _kernels import nearest_idx, polyline_length
+
+# Lane type masks for the waypoint lookups, built once since combining CARLA enums goes through the bindings
+_LT_DRIVING = carla.LaneType.Driving
+_LT_DRIVING_PARKING = carla.LaneType.Driving | carla.LaneType.Parking
+
+
+def _append_rows(buffer, count, rows):
+    """
+    Append rows to a preallocated [capacity, D] buffer, doubling the capacity when it is full. The rows are converted
+    to the dtype of the buffer.
+
+    Args:
+        buffer (np.ndarray): The preallocated buffer.
+        count (int): The number of valid rows in the buffer.
+        rows (array-like): The rows to append, each with D entries (e.g. [x, y, z]).
+
+    Returns:
+        np.ndarray: The (possibly reallocated) buffer.
+        int: The new number of valid rows.
+    """
+    rows = np.asarray(rows, dtype=buffer.dtype).reshape((-1, buffer.shape[1]))
+    new_count = count + rows.shape[0]
+
+    if new_count > buffer.shape[0]:
+        capacity = max(new_count, 2 * buffer.shape[0], 16)
+        new_buffer = np.empty((capacity, buffer.shape[1]), dtype=buffer.dtype)
+        new_buffer[:count] = buffer[:count]
+        buffer = new_buffer
+
+    buffer[count:new_count] = rows
+
+    return buffer, new_count
+
+
+def _remove_row(buffer, count, idx):
+    """
+    Remove a row from a preallocated buffer while keeping the order of the remaining rows.
+
+    Args:
+        buffer (np.ndarray): The preallocated buffer.
+        count (int): The number of valid rows in the buffer.
+        idx (int): The index of the row to remove.
+
+    Returns:
+        int: The new number of valid rows.
+    """
+    buffer[idx : count - 1] = buffer[idx + 1 : count]
+
+    return count - 1
+
+
+def _nearest_idx(points, loc):
+    """
+    Find the point closest to the provided location in the x-y plane without computing square roots.
+    The elevation is ignored, like for the clicks on the 2D map that the query locations come from.
+
+    Args:
+        points (np.ndarray): The points to search, shape [N, 2] or [N, 3].
+        loc (list): The query location as [x, y] or [x, y, z].
+
+    Returns:
+        int: The index of the closest point.
+        float: The squared distance to the closest point.
+    """
+    return nearest_idx(points, float(loc[0]), float(loc[1]))
+
+
+def _transform_attrib(attr_type, attr_value):
+    """Build the XML attributes of a transform given as [x, y, z, yaw]."""
+    return {"x": str(attr_value[0]), "y": str(attr_value[1]), "z": str(attr_value[2]), "yaw": str(attr_value[3])}
+
+
+def _location_attrib(attr_type, attr_value):
+    """Build the XML attributes of a location given as [x, y, z] or [x, y, z, p]."""
+    attrib = {"x": str(attr_value[0]), "y": str(attr_value[1]), "z": str(attr_value[2])}
+    if "probability" in attr_type:
+        attrib["p"] = str(attr_value[3])
+    return attrib
+
+
+def _value_attrib(attr_type, attr_value):
+    """Build the XML attributes of a single value, choice or bool."""
+    return {"value": str(attr_value)}
+
+
+def _interval_attrib(attr_type, attr_value):
+    """Build the XML attributes of an interval given as [from, to]."""
+    return {"from": str(attr_value[0]), "to": str(attr_value[1])}
+
+
+# Maps an attribute type to the function that builds the XML attributes of its element.
+# All location types (e.g. 'location driving') share the 'location' entry.
+_ATTRIBUTE_WRITERS = {
+    "transform": _transform_attrib,
+    "location": _location_attrib,
+    "value": _value_attrib,
+    "choice": _value_attrib,
+    "bool": _value_attrib,
+    "interval": _interval_attrib,
+}
+
+
+def _get_attribute_writer(attr_type):
+    """
+    Get the function that builds the XML attributes for the given attribute type.
+
+    Args:
+        attr_type (str): The type of the scenario attribute.
+
+    Returns:
+        callable: The attribute writer, or None if the attribute type has no XML attributes.
+    """
+    if "location" in attr_type:
+        return _ATTRIBUTE_WRITERS["location"]
+
+    return _ATTRIBUTE_WRITERS.get(attr_type)
 
 
 class Route:
@@ -31,24 +152,49 @@ class Route:
             route_id (int): The ID of the route.
             map_name (str): The name of the map for this route.
             weather_element (lxml.etree.Element): The XML element representing the weather conditions.
-            waypoints (list): A list of waypoints, each represented as [x, y, z].
+            waypoints (list or np.array): The waypoints, each represented as [x, y, z].
             scenarios (list): A list of lxml.etree.Element objects representing scenarios.
             scenario_types (list): A list of strings representing the types of scenarios.
-            scenario_trigger_points (list): A list of trigger points for scenarios, each represented as [x, y, z].
+            scenario_trigger_points (list or np.array): The trigger points for scenarios, each represented as [x, y, z].
             max_distance_when_removing (float): The maximum distance threshold for removing waypoints or scenarios (default=10).
         """
         self.carla_client = carla_client
         self.route_id = route_id
         self.map_name = map_name
         self.weather_element = weather_element
-        self.waypoints = waypoints
         self.scenarios = scenarios
         self.scenario_types = scenario_types
-        self.scenario_trigger_points = scenario_trigger_points
+        # Number of scenarios per type, used to number the names of new scenarios
+        self._scenario_type_counter = collections.Counter(scenario_types)
         self.max_distance_when_removing = max_distance_when_removing
 
+        # Hovering and clicking query the same location repeatedly, so the CARLA waypoint lookups are memoized
+        self._query_waypoint_location_cached = functools.lru_cache(maxsize=1024)(self._query_waypoint_location)
+
+        # The waypoints and trigger points are stored in contiguous buffers that grow by doubling.
+        # self.waypoints and self.scenario_trigger_points are views of the valid rows: [[x, y, z], ...]: np.array
+        # The trigger points are only used for distance tests in the x-y plane, so they are stored as [[x, y], ...]
+        # Both keep float64, so the loaded coordinates are saved unchanged. Only the dense waypoints are float32.
+        self._waypoints_np, self._waypoints_count = np.empty((0, 3), dtype=np.float64), 0
+        self._trigger_points_np, self._trigger_points_count = np.empty((0, 2), dtype=np.float64), 0
+        self._append_waypoint(waypoints)
+        self._append_trigger_point(scenario_trigger_points)
+
         self.route_length = 0  # in meters
-        self.dense_waypoints = []  # [[x, y, z], ...]: list
+        # The route length as shown in the window, only formatted again after the dense route changed
+        self._length_str_cache = None
+        self.dense_waypoints = np.empty((0, 3), dtype=np.float32)  # [[x, y, z], ...]: np.array
+        self._dense_waypoints_np, self._dense_count = np.empty((0, 3), dtype=np.float32), 0
+        # Dense waypoints per route waypoint: [[waypoints[0]], trace(0 -> 1), trace(1 -> 2), ...]: list of np.array
+        self._segment_dense = []
+        # carla.Location objects reused by trace_segment
+        self._reusable_locations = (carla.Location(), carla.Location())
+
+        # 2D KD-trees over the dense waypoints and the scenario trigger points for the nearest-point queries
+        self._dense_kdtree = None
+        self._trigger_points_kdtree = None
+        self.update_trigger_points_kdtree()
+
         self.update_dense_route()
 
     def generate_scenario_elem(self, loc, scenario_type, scenario_attributes):
@@ -64,29 +210,16 @@ class Route:
             lxml.etree.Element: The generated scenario XML element.
         """
         scenario_elem = etree.Element("scenario")
-        scenario_idx = self.scenario_types.count(scenario_type)
+        scenario_idx = self._scenario_type_counter[scenario_type]
 
         scenario_elem.set("name", f"{scenario_type}_{scenario_idx}")
         scenario_elem.set("type", scenario_type)
 
         for attr_name, attr_type, attr_value in scenario_attributes:
-            data = etree.SubElement(scenario_elem, attr_name)
-            if attr_type == "transform":
-                data.set("x", str(attr_value[0]))
-                data.set("y", str(attr_value[1]))
-                data.set("z", str(attr_value[2]))
-                data.set("yaw", str(attr_value[3]))
-            elif "location" in attr_type:
-                data.set("x", str(attr_value[0]))
-                data.set("y", str(attr_value[1]))
-                data.set("z", str(attr_value[2]))
-                if "probability" in attr_type:
-                    data.set("p", str(attr_value[3]))
-            elif attr_type in ("value", "choice", "bool"):
-                data.set("value", str(attr_value))
-            elif attr_type == "interval":
-                data.set("from", str(attr_value[0]))
-                data.set("to", str(attr_value[1]))
+            # Attributes of an unknown type are still written, as an element without XML attributes
+            attribute_writer = _get_attribute_writer(attr_type)
+            attrib = attribute_writer(attr_type, attr_value) if attribute_writer is not None else None
+            etree.SubElement(scenario_elem, attr_name, attrib=attrib)
 
         return scenario_elem
 
@@ -102,23 +235,22 @@ class Route:
         If there is an existing scenario closer than the `max_distance_when_removing` threshold, it is removed.
         """
         # If there is a scenario closer than `max_distance_when_removing`, remove it
-        carla_loc = carla.Location(loc[0], loc[1])
-        wp = self.carla_client.carla_map.get_waypoint(
-            carla_loc, lane_type=carla.LaneType.Driving | carla.LaneType.Parking
-        )
-        wp_loc = [wp.transform.location.x, wp.transform.location.y, wp.transform.location.z]
+        x, y, z, yaw = self.get_waypoint_location(loc)
+        wp_loc = [x, y, z]
 
         scenario_attributes.append(
             [
                 "trigger_point",
                 "transform",
-                [round(wp_loc[0], 1), round(wp_loc[1], 1), round(wp_loc[2], 1), round(wp.transform.rotation.yaw, 1)],
+                [round(x, 1), round(y, 1), round(z, 1), round(yaw, 1)],
             ]
         )
         scenario_elem = self.generate_scenario_elem(wp_loc, scenario_type, scenario_attributes)
         self.scenarios.append(scenario_elem)
-        self.scenario_trigger_points.append(wp_loc)
         self.scenario_types.append(scenario_type)
+        self._scenario_type_counter[scenario_type] += 1
+        self._append_trigger_point(wp_loc)
+        self.update_trigger_points_kdtree()
 
     def remove_scenario(self, loc):
         """
@@ -127,20 +259,19 @@ class Route:
         Args:
             loc (list): The location near the scenario trigger point as [x, y, z].
 
-        The scenario closest to the provided location is removed.
+        The scenario closest to the provided location is removed. The last scenario takes its place.
         """
-        carla_loc = carla.Location(loc[0], loc[1])
-        wp = self.carla_client.carla_map.get_waypoint(
-            carla_loc, lane_type=carla.LaneType.Driving | carla.LaneType.Parking
-        )
-        wp_loc = [wp.transform.location.x, wp.transform.location.y, wp.transform.location.z]
+        wp_loc = list(self.get_waypoint_location(loc)[:3])
 
-        diff = np.linalg.norm(np.array(self.scenario_trigger_points) - np.array(wp_loc)[None, :], axis=1)
-        min_idx = diff.argmin()
+        _, min_idx = self._trigger_points_kdtree.query(wp_loc[:2])
 
-        self.scenarios.pop(min_idx)
-        self.scenario_trigger_points.pop(min_idx)
-        self.scenario_types.pop(min_idx)
+        # The order of the scenarios doesn't matter, so the last scenario is moved into the gap (swap-pop)
+        self._scenario_type_counter[self.scenario_types[min_idx]] -= 1
+        for scenario_data in (self.scenarios, self.scenario_types):
+            scenario_data[min_idx] = scenario_data[-1]
+            scenario_data.pop()
+        self._pop_trigger_point(min_idx)
+        self.update_trigger_points_kdtree()
 
     def should_remove_scenario(self, loc):
         """
@@ -152,16 +283,11 @@ class Route:
         Returns:
             bool: True if a scenario should be removed, False otherwise.
         """
-        carla_loc = carla.Location(loc[0], loc[1])
-        wp = self.carla_client.carla_map.get_waypoint(
-            carla_loc, lane_type=carla.LaneType.Driving | carla.LaneType.Parking
-        )
-        wp_loc = [wp.transform.location.x, wp.transform.location.y, wp.transform.location.z]
+        wp_loc = list(self.get_waypoint_location(loc)[:3])
 
-        if self.scenario_trigger_points:
-            diff = np.linalg.norm(np.array(self.scenario_trigger_points) - np.array(wp_loc)[None, :], axis=1)
-            min_idx = diff.argmin()
-            if diff[min_idx] < self.max_distance_when_removing:
+        if self._trigger_points_kdtree is not None:
+            min_dist, _ = self._trigger_points_kdtree.query(wp_loc[:2])
+            if min_dist < self.max_distance_when_removing:
                 return True
 
         return False
@@ -176,17 +302,13 @@ class Route:
         Returns:
             bool: True if a scenario can be added, False otherwise.
         """
-        if not self.dense_waypoints:
+        if self._dense_kdtree is None:
             return False
 
-        carla_loc = carla.Location(loc[0], loc[1])
-        wp = self.carla_client.carla_map.get_waypoint(
-            carla_loc, lane_type=carla.LaneType.Driving | carla.LaneType.Parking
-        )
-        wp_loc = [wp.transform.location.x, wp.transform.location.y, wp.transform.location.z]
+        wp_loc = list(self.get_waypoint_location(loc)[:3])
 
-        diff = np.linalg.norm(np.array(self.dense_waypoints) - np.array(wp_loc)[None, :], axis=1)
-        return diff.min() < self.max_distance_when_removing
+        min_dist, _ = self._dense_kdtree.query(wp_loc[:2])
+        return min_dist < self.max_distance_when_removing
 
     def add_or_remove_waypoint(self, loc):
         """
@@ -201,47 +323,179 @@ class Route:
         add_point = True
 
         # Only the first waypoint can be on a parking lot in case the scenario starts with ParkingExit
-        lane_type = (
-            carla.LaneType.Driving | carla.LaneType.Parking if len(self.waypoints) == 0 else carla.LaneType.Driving
-        )
-
-        wp = self.carla_client.carla_map.get_waypoint(carla.Location(loc[0], loc[1]), lane_type=lane_type)
-        wp_loc = [wp.transform.location.x, wp.transform.location.y, wp.transform.location.z]
+        wp_loc = list(self.get_waypoint_location(loc, parking=self._waypoints_count == 0)[:3])
 
-        if self.waypoints:
-            diff = np.linalg.norm(np.array(self.waypoints) - np.array(wp_loc)[None, :], axis=1)
-            min_idx = diff.argmin()
-            if diff[min_idx] < self.max_distance_when_removing:
+        if self._waypoints_count:
+            min_idx, min_dist2 = _nearest_idx(self.waypoints, wp_loc)
+            if min_dist2 < self.max_distance_when_removing**2:
                 add_point = False
 
         if add_point:
             wp_loc = [round(wp_loc[0], 1), round(wp_loc[1], 1), round(wp_loc[2], 1)]
-            self.waypoints.append(wp_loc)
+            self._append_waypoint(wp_loc)
+            self.update_dense_route(changed_index=self._waypoints_count - 1)
         else:
-            self.waypoints.pop(min_idx)
-
-        self.update_dense_route()
+            self._pop_waypoint(min_idx)
+            self.update_dense_route(changed_index=min_idx)
 
-    def update_dense_route(self):
+    def update_dense_route(self, changed_index=None):
         """
-        Update the dense waypoints list by interpolating between the route waypoints.
+        Update the dense waypoints array by interpolating between the route waypoints.
         Also updates the route length.
+
+        Args:
+            changed_index (int, optional): The index of the single waypoint that was appended or removed since the
+                last update. Only the segments next to it are traced again. If None, the whole route is traced.
         """
-        self.dense_waypoints.clear()
-        self.route_length = 0
+        waypoints = self.waypoints.tolist()
 
-        if self.waypoints:
-            self.dense_waypoints.append(self.waypoints[0])
+        if changed_index is None:
+            # The segments are traced serially, the route planner and the CARLA map are not known to be thread-safe
+            traces = [self.trace_segment(key) for key in zip(waypoints[:-1], waypoints[1:])]
+            self._segment_dense = [self.waypoints[:1].astype(np.float32)] + traces if waypoints else []
 
-        for i in range(len(self.waypoints) - 1):
-            from_loc, to_loc = self.waypoints[i], self.waypoints[i + 1]
-            from_loc = carla.Location(from_loc[0], from_loc[1], from_loc[2])
-            to_loc = carla.Location(to_loc[0], to_loc[1], to_loc[2])
+        elif len(self._segment_dense) < self._waypoints_count:
+            # The waypoint was appended, so only the new last segment is traced and appended to the dense route
+            if changed_index == 0:
+                segment = self.waypoints[:1].astype(np.float32)
+            else:
+                segment = self.trace_segment((waypoints[-2], waypoints[-1]))
+            self._segment_dense.append(segment)
+
+            self._length_str_cache = None
+            if self._dense_count:
+                self.route_length += polyline_length(np.concatenate([self.dense_waypoints[-1:], segment], axis=0))
+            self._dense_waypoints_np, self._dense_count = _append_rows(
+                self._dense_waypoints_np, self._dense_count, segment
+            )
+            self.dense_waypoints = self._dense_waypoints_np[: self._dense_count]
+            self.update_dense_kdtree()
+            return
 
-            self.dense_waypoints += self.interpolate_trace(from_loc, to_loc)
+        else:
+            # The waypoint was removed, so the two segments next to it are replaced by one between its neighbors
+            del self._segment_dense[changed_index]
+            if changed_index == 0 and self._segment_dense:
+                self._segment_dense[0] = self.waypoints[:1].astype(np.float32)
+            elif 0 < changed_index < self._waypoints_count:
+                self._segment_dense[changed_index] = self.trace_segment(
+                    (waypoints[changed_index - 1], waypoints[changed_index])
+                )
+
+        # A single concatenation into a contiguous buffer instead of growing a list per segment
+        if self._segment_dense:
+            self._dense_waypoints_np = np.concatenate(self._segment_dense, axis=0)
+        else:
+            self._dense_waypoints_np = np.empty((0, 3), dtype=np.float32)
+        self._dense_count = self._dense_waypoints_np.shape[0]
+        self.dense_waypoints = self._dense_waypoints_np[: self._dense_count]
 
-        if len(self.dense_waypoints) > 1:
-            self.route_length = np.linalg.norm(np.diff(np.array(self.dense_waypoints), axis=0), axis=1).sum()
+        self.route_length = polyline_length(self.dense_waypoints) if self._dense_count > 1 else 0
+        self._length_str_cache = None
+        self.update_dense_kdtree()
+
+    @property
+    def formatted_length_km(self):
+        """
+        The route length in kilometers, formatted for the window.
+
+        Returns:
+            str: The route length, e.g. "1.234 km".
+        """
+        if self._length_str_cache is None:
+            self._length_str_cache = f"{round(self.route_length/1000.,3)} km"
+        return self._length_str_cache
+
+    def update_dense_kdtree(self):
+        """
+        Rebuild the KD-tree over the dense waypoints after they changed.
+        """
+        self._dense_kdtree = cKDTree(self._dense_waypoints_np[: self._dense_count, :2]) if self._dense_count else None
+
+    def trace_segment(self, segment_key):
+        """
+        Interpolate dense waypoints between two route waypoints.
+
+        Args:
+            segment_key (tuple): The two route waypoints as ([x, y, z], [x, y, z]).
+
+        Returns:
+            np.array: The interpolated waypoints, shape [N, 3].
+        """
+        # Reuse one pair of locations instead of constructing two new CARLA objects per segment.
+        # interpolate_trace only reads them to look up the closest waypoints, so overwriting them is safe.
+        from_loc, to_loc = self._reusable_locations
+
+        (from_loc.x, from_loc.y, from_loc.z), (to_loc.x, to_loc.y, to_loc.z) = segment_key
+
+        return self.interpolate_trace(from_loc, to_loc)
+
+    def get_waypoint_location(self, loc, parking=True):
+        """
+        Get the location and yaw of the waypoint closest to the provided location.
+
+        Args:
+            loc (list): The query location as [x, y, z]. Only x and y are used and quantized to 0.1 m,
+                so that nearby queries hit the cache.
+            parking (bool): Whether parking lanes are considered in addition to driving lanes (default=True).
+
+        Returns:
+            tuple: The waypoint as (x, y, z, yaw).
+        """
+        return self._query_waypoint_location_cached(round(float(loc[0]), 1), round(float(loc[1]), 1), parking)
+
+    def _query_waypoint_location(self, x, y, parking):
+        """
+        Query the CARLA map for the waypoint closest to (x, y). Use get_waypoint_location instead, which is cached.
+        """
+        lane_type = _LT_DRIVING_PARKING if parking else _LT_DRIVING
+        wp = self.carla_client.carla_map.get_waypoint(carla.Location(x, y), lane_type=lane_type)
+        location, rotation = wp.transform.location, wp.transform.rotation
+
+        return location.x, location.y, location.z, rotation.yaw
+
+    def _append_waypoint(self, wp_loc):
+        """
+        Append one or more waypoints, each represented as [x, y, z], to the waypoint buffer.
+        """
+        self._waypoints_np, self._waypoints_count = _append_rows(self._waypoints_np, self._waypoints_count, wp_loc)
+        self.waypoints = self._waypoints_np[: self._waypoints_count]
+
+    def _pop_waypoint(self, idx):
+        """
+        Remove the waypoint at the given index from the waypoint buffer.
+        """
+        self._waypoints_count = _remove_row(self._waypoints_np, self._waypoints_count, idx)
+        self.waypoints = self._waypoints_np[: self._waypoints_count]
+
+    def _append_trigger_point(self, wp_loc):
+        """
+        Append one or more scenario trigger points, each represented as [x, y, z], to the trigger point buffer.
+        Only x and y are stored.
+        """
+        wp_loc = np.asarray(wp_loc, dtype=np.float64).reshape((-1, 3))[:, :2]
+        self._trigger_points_np, self._trigger_points_count = _append_rows(
+            self._trigger_points_np, self._trigger_points_count, wp_loc
+        )
+        self.scenario_trigger_points = self._trigger_points_np[: self._trigger_points_count]
+
+    def _pop_trigger_point(self, idx):
+        """
+        Remove the scenario trigger point at the given index from the trigger point buffer by moving the last
+        trigger point into its place, matching the removal in remove_scenario.
+        """
+        self._trigger_points_count -= 1
+        self._trigger_points_np[idx] = self._trigger_points_np[self._trigger_points_count]
+        self.scenario_trigger_points = self._trigger_points_np[: self._trigger_points_count]
+
+    def update_trigger_points_kdtree(self):
+        """
+        Rebuild the KD-tree over the scenario trigger points after they changed.
+        """
+        if self._trigger_points_count:
+            self._trigger_points_kdtree = cKDTree(self._trigger_points_np[: self._trigger_points_count])
+        else:
+            self._trigger_points_kdtree = None
 
     def interpolate_trace(self, from_loc, to_loc):
         """
@@ -252,7 +506,7 @@ class Route:
             to_loc (carla.Location): The ending location for the interpolation.
 
         Returns:
-            list: A list of interpolated waypoints, each represented as [x, y, z].
+            np.array: The interpolated waypoints, shape [N, 3].
         """
         from_wp = self.carla_client.carla_map.get_waypoint(from_loc)
         from_loc = from_wp.transform.location
@@ -260,9 +514,12 @@ class Route:
         to_wp = self.carla_client.carla_map.get_waypoint(to_loc)
         to_loc = to_wp.transform.location
 
-        interpolated_trace = self.carla_client.global_route_planner.trace_route(from_loc, to_loc)
-        interpolated_trace = [x[0].transform.location for x in interpolated_trace]
-        interpolated_trace = [[x.x, x.y, x.z] for x in interpolated_trace]
+        trace = self.carla_client.global_route_planner.trace_route(from_loc, to_loc)
+
+        interpolated_trace = np.empty((len(trace), 3), dtype=np.float32)
+        for i, (wp, _) in enumerate(trace):
+            location = wp.transform.location
+            interpolated_trace[i] = (location.x, location.y, location.z)
 
         return interpolated_trace
 
@@ -274,13 +531,14 @@ class Route:
             to_loc (carla.Location): The ending location for the interpolation.
 
         Returns:
-            list: A list of interpolated waypoints, each represented as [x, y, z].
+            np.array: The interpolated waypoints, shape [N, 3].
         """
-        if self.waypoints:
-            from_loc = carla.Location(self.waypoints[-1][0], self.waypoints[-1][1], self.waypoints[-1][2])
+        if self._waypoints_count:
+            last_wp = self.waypoints[-1].tolist()
+            from_loc = carla.Location(last_wp[0], last_wp[1], last_wp[2])
             return self.interpolate_trace(from_loc, to_loc)
 
-        return []
+        return np.empty((0, 3), dtype=np.float32)
 
     def add_location_transform_attributes_to_last_scenario(self, location_transform_attributes):
         """
@@ -294,17 +552,8 @@ class Route:
         """
         scenario_elem = self.scenarios[-1]
         for attr_name, attr_type, attr_value in location_transform_attributes:
-            data = etree.SubElement(scenario_elem, attr_name)
-            if attr_type == "transform":
-                data.set("x", str(attr_value[0]))
-                data.set("y", str(attr_value[1]))
-                data.set("z", str(attr_value[2]))
-                data.set("yaw", str(attr_value[3]))
-            elif "location" in attr_type:
-                data.set("x", str(attr_value[0]))
-                data.set("y", str(attr_value[1]))
-                data.set("z", str(attr_value[2]))
-                if "probability" in attr_type:
-                    data.set("p", str(attr_value[3]))
-            else:
+            if attr_type != "transform" and "location" not in attr_type:
                 raise NotImplementedError("Unsupported attribute type encountered!")
+
+            attribute_writer = _get_attribute_writer(attr_type)
+            etree.SubElement(scenario_elem, attr_name, attrib=attribute_writer(attr_type, attr_value))
@@ -9,6 +9,16 @@ import os
 import pickle
 import numpy as np
 from agents.navigation.global_route_planner import GlobalRoutePlanner
+from _kernels import minmax
+
+# The entries of the pre-generated map data, see save_carla_map_data.py
+MAP_DATA_KEYS = (
+    "stop_sign_centers_np",
+    "traffic_light_centers_np",
+    "all_waypoints_np",
+    "num_road_waypoints",
+    "num_parking_waypoints",
+)
 
 
 class ConnectionError(Exception):
@@ -52,14 +62,12 @@ class CarlaClient:
 
     def get_available_maps(self):
         """
-        Returns a list of available maps in the CARLA simulator.
+        Returns the available maps in the CARLA simulator.
 
         Returns:
-            list: A list of available map names.
+            tuple: The available map names.
         """
-        available_maps = self.client.get_available_maps()
-        available_maps = [x.split("/")[-1] for x in available_maps]
-        return available_maps
+        return tuple(map(os.path.basename, self.client.get_available_maps()))
 
     def load_map(self, map_name):
         """
@@ -80,6 +88,33 @@ class CarlaClient:
 
         self.aggregate_map_data(map_name)
 
+    def load_map_data(self, map_name):
+        """
+        Loads the pre-generated map data of the specified map. If the map data is stored as one .npy file
+        per array (see save_carla_map_data.py and convert_map_data_to_npy.py), the arrays are memory-mapped.
+        Otherwise, the .npz file or, for older map data, the pickle file is loaded.
+
+        Args:
+            map_name (str): The name of the map for which to load the data.
+
+        Returns:
+            dict: The map data, with the keys listed in MAP_DATA_KEYS.
+        """
+        npy_dir = os.path.join(self.carla_map_dir, map_name)
+        if os.path.isdir(npy_dir):
+            return {
+                key: np.load(os.path.join(npy_dir, f"{key}.npy"), mmap_mode="r" if key.endswith("_np") else None)
+                for key in MAP_DATA_KEYS
+            }
+
+        npz_path = os.path.join(self.carla_map_dir, f"{map_name}.npz")
+        if os.path.isfile(npz_path):
+            with np.load(npz_path) as data:
+                return {key: data[key] for key in MAP_DATA_KEYS}
+
+        with open(os.path.join(self.carla_map_dir, f"{map_name}.pkl"), "rb") as file:
+            return pickle.load(file)
+
     def aggregate_map_data(self, map_name):
         """
         Aggregates relevant map data for the specified map, such as stop sign centers, traffic light centers,
@@ -88,8 +123,7 @@ class CarlaClient:
         Args:
             map_name (str): The name of the map for which to aggregate data.
         """
-        with open(os.path.join(self.carla_map_dir, f"{map_name}.pkl"), "rb") as file:
-            data = pickle.load(file)
+        data = self.load_map_data(map_name)
 
         # Process stop sign centers
         stop_sign_centers_np = data["stop_sign_centers_np"]
@@ -104,7 +138,7 @@ class CarlaClient:
         traffic_light_centers_np = traffic_light_centers_np.reshape((-1, 2))
 
         all_waypoints_np = data["all_waypoints_np"][:, :2]
-        num_road_waypoints = data["num_road_waypoints"]
+        num_road_waypoints = int(data["num_road_waypoints"])
 
         self.stop_sign_centers_np = stop_sign_centers_np
         self.traffic_light_centers_np = traffic_light_centers_np
@@ -112,7 +146,6 @@ class CarlaClient:
         # Calculate map dimensions
         self.road_waypoints_np = all_waypoints_np[:num_road_waypoints]
         self.parking_waypoints_np = all_waypoints_np[num_road_waypoints:]
-        self.min_coords = all_waypoints_np.min(axis=0)
-        self.max_coords = all_waypoints_np.max(axis=0)
+        self.min_coords, self.max_coords = minmax(all_waypoints_np)
         self.map_width, self.map_height = (self.max_coords - self.min_coords)[:2].astype("int")
         self.map_size = np.array([self.map_width, self.map_height])
@@ -0,0 +1,25 @@
+"""
+This script converts pickled map data, such as the map data provided with this repository, into one .npy
+file per array, stored in a directory named after the map (e.g. carla_map_data/Town01/all_waypoints_np.npy).
+The CarlaClient memory-maps these files instead of unpickling the whole map data when a map is loaded.
+"""
+
+import argparse
+import os
+import pathlib
+import pickle
+
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--map-data-dir", type=str, default="carla_map_data", help="The path of the map data.")
+args = parser.parse_args()
+
+for pickle_path in sorted(pathlib.Path(args.map_data_dir).glob("*.pkl")):
+    with open(pickle_path, "rb") as f:
+        data = pickle.load(f)
+
+    npy_dir = pickle_path.with_suffix("")
+    npy_dir.mkdir(exist_ok=True)
+    for key, value in data.items():
+        np.save(os.path.join(npy_dir, f"{key}.npy"), np.asarray(value))
@@ -3,51 +3,64 @@ This script creates a GUI window using PyQt5 that displays a loading animation a
 while performing a time-consuming operation. The operation can be either a blocking function or a
 non-blocking function (e.g., a function that emits signals or uses callbacks). This design prevents
 the main GUI thread from freezing during the operation, ensuring a smooth user experience.
+The window can be reused for several operations with `run_task`.
 """
 
 import sys
-import time
 
 from PyQt5.QtWidgets import QDialog, QApplication, QVBoxLayout, QLabel
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QEventLoop
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal, QEventLoop
 from PyQt5.QtGui import QFont, QMovie
 
 
-class LongRunningTask(QThread):
+class LongRunningTaskSignals(QObject):
     """
-    A QThread subclass that runs a time-consuming task in a separate thread.
+    Holds the signals of a LongRunningTask, since a QRunnable is not a QObject and can't define signals itself.
     """
 
     task_completed = pyqtSignal(object)
+    task_failed = pyqtSignal(object)
 
-    def __init__(self, parent, task_function):
+
+class LongRunningTask(QRunnable):
+    """
+    A QRunnable that runs a time-consuming task on a thread of the global QThreadPool.
+    """
+
+    def __init__(self, task_function):
         """
-        Initializes the LongRunningTask thread.
+        Initializes the LongRunningTask.
 
         Args:
-            parent (QObject): The parent object of the thread.
             task_function (callable): The function to be executed in the separate thread.
         """
-        super().__init__(parent)
+        super().__init__()
         self.task_function = task_function
+        self.signals = LongRunningTaskSignals()
 
     def run(self):
         """
-        Runs the task function and emits the task_completed signal when done.
+        Runs the task function and emits the task_completed signal with its result when done, or the task_failed
+        signal with the raised exception.
         """
-        time.sleep(0.5)
-        result = self.task_function()
-        self.task_completed.emit(result)
+        try:
+            result = self.task_function()
+        except Exception as exception:
+            self.signals.task_failed.emit(exception)
+            return
+
+        self.signals.task_completed.emit(result)
 
 
 class LoadingIndicatorWindow(QDialog):
-    def __init__(self, parent, message_text, task_function):
+    def __init__(self, parent, message_text, task_function=None):
         """
         Initializes the LoadingIndicatorWindow.
 
         Args:
             message_text (str): The text message to display alongside the loading animation.
-            task_function (callable): The time-consuming task function to be executed.
+            task_function (callable, optional): The time-consuming task function to be executed right away.
+                Without it, the window is only built and tasks are run with run_task.
             parent (QWidget, optional): The parent widget of the window. Defaults to None.
         """
         super().__init__(parent)
@@ -55,13 +68,18 @@ class LoadingIndicatorWindow(QDialog):
         self.setModal(True)
 
         self.task_function = task_function
+        self.task = None
+        self.task_result = None
+        self.task_exception = None
 
         # Create a QMovie object from the GIF file
         self.loading_animation = QMovie("scripts/images/loading_animation.gif")
+        # Decode and cache the first frame right away, so the animation is visible before the task starts
+        self.loading_animation.setCacheMode(QMovie.CacheAll)
+        self.loading_animation.jumpToFrame(0)
         self.animation_label = QLabel()
         self.animation_label.setAlignment(Qt.AlignCenter)
         self.animation_label.setMovie(self.loading_animation)
-        self.loading_animation.start()
 
         # Create a QLabel for the text message
         self.message_label = QLabel()
@@ -82,17 +100,66 @@ class LoadingIndicatorWindow(QDialog):
         # Remove the window frame for a cleaner look
         self.setWindowFlag(Qt.FramelessWindowHint)
 
-        # Start the long-running task in a separate thread
-        self.task_thread = LongRunningTask(self, self.task_function)
-        self.task_thread.task_completed.connect(self.close)
+        # Create an event loop for the loading window
+        self.event_loop = QEventLoop()
+
+        if task_function is not None:
+            self.run_task(task_function)
+
+    def run_task(self, task_function, message_text=None):
+        """
+        Shows the window and runs the task function on a pooled thread. Returns once the task is done.
+        The window stays responsive, since the task doesn't run on the GUI thread.
+
+        Args:
+            task_function (callable): The time-consuming task function to be executed.
+            message_text (str, optional): A new text message to display. Defaults to the current message.
+
+        Returns:
+            The result of the task function. An exception raised by it is raised again on the GUI thread.
+        """
+        if message_text is not None:
+            self.message_label.setText(message_text)
+        self.task_function = task_function
+        self.task_result = None
+        self.task_exception = None
+
+        # Start the long-running task on a pooled thread, which is reused by subsequent tasks
+        self.task = LongRunningTask(self.task_function)
+        self.task.signals.task_completed.connect(self.on_task_completed)
+        self.task.signals.task_failed.connect(self.on_task_failed)
 
+        self.loading_animation.start()
         self.show()
-        self.task_thread.start()
+        QThreadPool.globalInstance().start(self.task)
 
-        # Create an event loop for the loading window
-        self.event_loop = QEventLoop()
         self.event_loop.exec_()
 
+        if self.task_exception is not None:
+            raise self.task_exception
+        return self.task_result
+
+    def on_task_completed(self, result):
+        """
+        Stores the result of the task and closes the window. Runs on the GUI thread.
+
+        Args:
+            result: The result of the task function.
+        """
+        self.task_result = result
+        self.close()
+
+    def on_task_failed(self, exception):
+        """
+        Stores the exception raised by the task and closes the window, instead of showing it forever.
+        Runs on the GUI thread.
+
+        Args:
+            exception (Exception): The exception raised by the task function.
+        """
+        self.task_exception = exception
+        self.close()
+
     def closeEvent(self, event):
         """
         Overrides the closeEvent method to prevent the user from closing the window manually.
@@ -102,6 +169,7 @@ class LoadingIndicatorWindow(QDialog):
         """
         # Ignore the close event unless it's a spontaneous event
         if not event.spontaneous():
+            self.loading_animation.stop()
             self.event_loop.quit()
             event.accept()
         else:
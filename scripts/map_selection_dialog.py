@@ -1,14 +1,43 @@
 """
 This script creates a GUI window using PyQt5 that displays a list of available maps from a Carla client.
 The user can select a map from the list, and the selected map's name is stored in the `selected_map_name` attribute.
+The dialog can be shown repeatedly with `select_map`, its widgets are only built the first time it is shown.
 """
 
+import functools
 import sys
-from PyQt5.QtWidgets import QDialog, QListWidgetItem, QApplication, QPushButton, QVBoxLayout, QHBoxLayout, QListWidget
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QApplication, QPushButton, QVBoxLayout, QHBoxLayout, QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QStringListModel
 from carla_simulator_client import CarlaClient
 
 
+@functools.lru_cache(maxsize=1)
+def _cached_available_maps(carla_client):
+    """
+    Returns the sorted available maps of the CARLA simulator. The map list doesn't change while the simulator
+    is running, so the result is memoized per client.
+
+    Args:
+        carla_client (CarlaClient): An instance of the CarlaClient class.
+
+    Returns:
+        tuple: The sorted map names.
+    """
+    return tuple(sorted(carla_client.get_available_maps()))
+
+
+class CenteredStringListModel(QStringListModel):
+    """
+    A QStringListModel whose entries are displayed horizontally centered.
+    """
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignHCenter
+
+        return super().data(index, role)
+
+
 class MapSelectionDialog(QDialog):
     def __init__(self, carla_client, parent=None):
         """
@@ -21,30 +50,33 @@ class MapSelectionDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Route Creator")
         self.setGeometry(100, 100, 500, 300)
+        self.setModal(True)
         self.carla_client = carla_client
 
+        self.maps_model = None
+        self.maps_list_view = None
+        self.selected_map_name = None
+
+    def build_ui(self):
+        """
+        Builds the map list and the buttons of the dialog.
+        """
         # Create the main layout and set it for the window
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
 
-        # Get the list of available maps from the Carla client and sort it
-        available_maps = sorted(carla_client.get_available_maps())
-
-        # Create a list widget to display the available maps
-        maps_list_widget = QListWidget()
-        for map_name in available_maps:
-            map_item = QListWidgetItem(map_name)
-            map_item.setTextAlignment(Qt.AlignHCenter)
-            maps_list_widget.addItem(map_item)
+        # Get the sorted list of available maps, which is only requested from the server once
+        available_maps = _cached_available_maps(self.carla_client)
 
-        # Set the first item in the list as the initially selected map
-        first_map_item = maps_list_widget.item(0)
-        maps_list_widget.setCurrentItem(first_map_item)
-        self.selected_map_name = first_map_item.text()
+        # Create a list view to display the available maps
+        self.maps_model = CenteredStringListModel(list(available_maps), self)
+        self.maps_list_view = QListView()
+        self.maps_list_view.setModel(self.maps_model)
+        self.maps_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
 
-        # Connect the itemClicked signal to handle map selection
-        maps_list_widget.itemClicked.connect(self.handle_map_selection)
-        main_layout.addWidget(maps_list_widget)
+        # Connect the clicked signal to handle map selection
+        self.maps_list_view.clicked.connect(self.handle_map_selection)
+        main_layout.addWidget(self.maps_list_view)
 
         # Create a layout for the buttons
         button_layout = QHBoxLayout()
@@ -61,9 +93,38 @@ class MapSelectionDialog(QDialog):
 
         main_layout.addLayout(button_layout)
 
-        self.setModal(True)
+    def reset(self):
+        """
+        Sets the first map in the list as the selected map, like for a newly opened dialog.
+        """
+        first_map_index = self.maps_model.index(0)
+        self.maps_list_view.setCurrentIndex(first_map_index)
+        self.selected_map_name = first_map_index.data()
+
+    def select_map(self):
+        """
+        Shows the dialog and waits until the user selected a map or canceled the selection.
+
+        Returns:
+            str: The name of the selected map, or None if the selection was canceled.
+        """
         self.exec_()
 
+        return self.selected_map_name
+
+    def showEvent(self, event):
+        """
+        Builds the widgets when the dialog is shown for the first time and resets the selection.
+
+        Args:
+            event (QShowEvent): The show event object.
+        """
+        if self.maps_model is None:
+            self.build_ui()
+        self.reset()
+
+        super().showEvent(event)
+
     def closeEvent(self, event):
         """
         Handles the close event of the window.
@@ -83,14 +144,14 @@ class MapSelectionDialog(QDialog):
         self.selected_map_name = None
         self.close()
 
-    def handle_map_selection(self, selected_item):
+    def handle_map_selection(self, selected_index):
         """
         Handles the map selection event.
 
         Args:
-            selected_item (QListWidgetItem): The selected map item.
+            selected_index (QModelIndex): The index of the selected map.
         """
-        self.selected_map_name = selected_item.text()
+        self.selected_map_name = selected_index.data()
 
 
 if __name__ == "__main__":
@@ -7,10 +7,20 @@ the route data and related functionality.
 Proposed file name: route_manager.py
 """
 
+import bisect
+import copy
+import os
+
+import numpy as np
 from carla_route import Route
 from lxml import etree
 from carla_simulator_client import CarlaClient
 
+# XPath expressions used when loading route files, compiled once
+_XP_POSITIONS = etree.XPath("./waypoints/position")
+_XP_SCENARIOS = etree.XPath("./scenarios/scenario")
+_XP_TRIGGER_POINT = etree.XPath("./trigger_point")
+
 
 class RouteManager:
     def __init__(self, carla_client):
@@ -23,7 +33,14 @@ class RouteManager:
         self.carla_client = carla_client
 
         self.routes = {}
+        self.sorted_ids = []  # The keys of self.routes in ascending order, kept sorted on every change
         self.selected_route_id = None
+        # IDs are handed out monotonically, so IDs of removed routes are not reused
+        self._next_route_id = 0
+        # Dense waypoints of all routes in one array, the route ID per row and the (route ID, array) pairs of the routes
+        self._dense_all = np.empty((0, 3), dtype=np.float32)
+        self._dense_all_route_ids = np.empty(0, dtype=np.int64)
+        self._dense_all_sources = []
         self.weather = None
         # We assume every route file is only located in the same map. Technically, that's not necessarily true,
         # but all route files that we have are only located in the same map per file.
@@ -31,15 +48,20 @@ class RouteManager:
 
     def empty_routes(self, map_name):
         """
-        Clear existing routes, load the specified map, and add an empty route.
+        Clear existing routes, load the specified map if it isn't active yet, and add an empty route.
 
         Args:
             map_name (str): The name of the map to load.
         """
+        # Reloading the map that is already active would only cost time
+        if self.map_name != map_name:
+            self.carla_client.load_map(map_name)
+            self.weather = self.carla_client.carla_world.get_weather()
+
         self.map_name = map_name
         self.routes.clear()
-        self.carla_client.load_map(map_name)
-        self.weather = self.carla_client.carla_world.get_weather()
+        self.sorted_ids.clear()
+        self._next_route_id = 0
 
         self.add_empty_route()
 
@@ -59,27 +81,36 @@ class RouteManager:
         self.routes.clear()
         self.selected_route_id = None
 
-        root = etree.parse(file_path)
-        for i, route_elem in enumerate(root.iter("route")):
+        # Stream the routes instead of building the whole DOM first, processed routes are freed right away.
+        # The indentation between the elements is dropped, so no text nodes are created for it.
+        context = etree.iterparse(file_path, events=("end",), tag="route", remove_blank_text=True)
+        for i, (_, route_elem) in enumerate(context):
             map_name = route_elem.get("town")
-            if i == 0:
+            if i == 0 and self.map_name != map_name:
                 self.carla_client.load_map(map_name)
                 self.weather = self.carla_client.carla_world.get_weather()
 
             route_id = int(route_elem.get("id"))
             self.map_name = map_name
-            weather_element = route_elem.find("weathers")
-            waypoints = [
-                [float(pos.get("x")), float(pos.get("y")), float(pos.get("z"))]
-                for pos in route_elem.findall("./waypoints/position")
-            ]
-
-            scenarios = route_elem.findall("./scenarios/scenario")
+            # The weather and scenario elements are copied, so they survive clearing the route element below
+            weather_element = copy.deepcopy(route_elem.find("weathers"))
+            positions = _XP_POSITIONS(route_elem)
+            waypoints = np.fromiter(
+                (float(pos.get(coord)) for pos in positions for coord in "xyz"),
+                dtype=np.float64,
+                count=3 * len(positions),
+            ).reshape((-1, 3))
+
+            scenarios = [copy.deepcopy(scenario) for scenario in _XP_SCENARIOS(route_elem)]
             scenario_types = [scenario.get("type") for scenario in scenarios]
-            scenario_trigger_points = [
-                [float(trigger.get("x")), float(trigger.get("y")), float(trigger.get("z"))]
-                for trigger in [scenario.find("trigger_point") for scenario in scenarios]
-            ]
+            scenario_trigger_points = np.empty((len(scenarios), 3), dtype=np.float64)
+            for j, scenario in enumerate(scenarios):
+                trigger = _XP_TRIGGER_POINT(scenario)[0]
+                scenario_trigger_points[j] = (float(trigger.get("x")), float(trigger.get("y")), float(trigger.get("z")))
+
+            route_elem.clear()
+            while route_elem.getprevious() is not None:
+                del route_elem.getparent()[0]
 
             self.routes[route_id] = Route(
                 self.carla_client,
@@ -92,15 +123,18 @@ class RouteManager:
                 scenario_trigger_points,
             )
 
+        self.sorted_ids = sorted(self.routes)
+        self._next_route_id = max(self.routes, default=-1) + 1
         if self.routes:
             self.selected_route_id = next(iter(self.routes.keys()))
 
-    def save_routes_to_file(self, file_path):
+    def save_routes_to_file(self, file_path, pretty_print=True):
         """
         Save routes to an XML file.
 
         Args:
             file_path (str): The path to save the XML file.
+            pretty_print (bool): Whether to indent the XML, which roughly doubles the file size (default=True).
         """
         if not file_path.endswith(".xml"):
             file_path = file_path + ".xml"
@@ -114,7 +148,8 @@ class RouteManager:
             route_elem.append(route.weather_element)
 
             waypoints_elem = etree.SubElement(route_elem, "waypoints")
-            for wp in route.waypoints:
+            # str() of a float yields its shortest representation, e.g. "592.3"
+            for wp in route.waypoints.tolist():
                 loc = etree.SubElement(waypoints_elem, "position")
                 loc.attrib.update({coord: str(value) for coord, value in zip(["x", "y", "z"], wp)})
 
@@ -123,7 +158,18 @@ class RouteManager:
                 scenarios_elem.append(scenario)
 
         tree = etree.ElementTree(routes_elem)
-        tree.write(file_path, pretty_print=True)
+
+        # Written to a temporary file next to the target, which then replaces it. A failed or interrupted save
+        # leaves the previous file untouched instead of a partially written one.
+        tmp_path = file_path + ".tmp"
+        try:
+            with open(tmp_path, "wb", buffering=1 << 20) as file:
+                tree.write(file, pretty_print=pretty_print, xml_declaration=True, encoding="utf-8")
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def generate_random_weather_elem(self):
         """
@@ -133,27 +179,26 @@ class RouteManager:
             lxml.etree.Element: The generated weather XML element.
         """
         weather = self.weather
+        weather_attributes = {
+            "cloudiness": weather.cloudiness,
+            "precipitation": weather.precipitation,
+            "precipitation_deposits": weather.precipitation_deposits,
+            "wetness": weather.wetness,
+            "wind_intensity": weather.wind_intensity,
+            "sun_azimuth_angle": weather.sun_azimuth_angle,
+            "sun_altitude_angle": weather.sun_altitude_angle,
+            "fog_density": weather.fog_density,
+            "fog_distance": weather.fog_distance,
+            "fog_falloff": round(weather.fog_falloff, 2),
+            "scattering_intensity": weather.scattering_intensity,
+            "mie_scattering_scale": round(weather.mie_scattering_scale, 2),
+        }
+        weather_attributes = {name: str(value) for name, value in weather_attributes.items()}
 
-        weather_string = f"         <weather\n"
-        weather_string += f'            route_percentage="0"\n'
-        weather_string += f'            cloudiness="{weather.cloudiness}" '
-        weather_string += f'precipitation="{weather.precipitation}" '
-        weather_string += f'precipitation_deposits="{weather.precipitation_deposits}" '
-        weather_string += f'wetness="{weather.wetness}"\n'
-        weather_string += f'            wind_intensity="{weather.wind_intensity}" '
-        weather_string += f'sun_azimuth_angle="{weather.sun_azimuth_angle}" '
-        weather_string += f'sun_altitude_angle="{weather.sun_altitude_angle}"\n'
-        weather_string += f'            fog_density="{weather.fog_density}" '
-        weather_string += f'fog_distance="{weather.fog_distance}" '
-        weather_string += f'fog_falloff="{round(weather.fog_falloff, 2)}" '
-        weather_string += f'scattering_intensity="{weather.scattering_intensity}"\n'
-        weather_string += f'            mie_scattering_scale="{round(weather.mie_scattering_scale, 2)}"/>'
-
-        weather_elem1 = etree.fromstring(weather_string)
-        weather_elem2 = etree.fromstring(weather_string.replace('route_percentage="0"', 'route_percentage="100"'))
         weathers_elem = etree.Element("weathers")
-        weathers_elem.append(weather_elem1)
-        weathers_elem.append(weather_elem2)
+        for route_percentage in (0, 100):
+            weather_elem = etree.SubElement(weathers_elem, "weather", route_percentage=str(route_percentage))
+            weather_elem.attrib.update(weather_attributes)
 
         return weathers_elem
 
@@ -165,9 +210,8 @@ class RouteManager:
             dict: The updated routes dictionary.
             int: The ID of the newly added route.
         """
-        route_id = 0
-        while route_id in self.routes:
-            route_id += 1
+        route_id = self._next_route_id
+        self._next_route_id += 1
 
         waypoints, scenarios, scenario_types, scenario_trigger_points = [], [], [], []
         weather_elem = self.generate_random_weather_elem()
@@ -183,15 +227,45 @@ class RouteManager:
             scenario_trigger_points,
         )
         self.routes[route_id] = route
+        bisect.insort(self.sorted_ids, route_id)
         self.selected_route_id = route_id
 
         return self.routes, self.selected_route_id
 
+    def get_dense_waypoints_of_all_routes(self):
+        """
+        Get the dense waypoints of all routes concatenated into one array. The array is only rebuilt after a route
+        was added or removed or the dense waypoints of a route changed.
+
+        Returns:
+            np.array: The dense waypoints of all routes, shape [N, 3].
+            np.array: The ID of the route each dense waypoint belongs to, shape [N].
+        """
+        # Routes replace their dense waypoints array whenever they change, so comparing identities suffices
+        sources = [(route_id, route.dense_waypoints) for route_id, route in self.routes.items()]
+        if len(sources) != len(self._dense_all_sources) or any(
+            route_id != cached_route_id or dense_waypoints is not cached_dense_waypoints
+            for (route_id, dense_waypoints), (cached_route_id, cached_dense_waypoints) in zip(
+                sources, self._dense_all_sources
+            )
+        ):
+            self._dense_all = np.concatenate(
+                [np.empty((0, 3), dtype=np.float32), *(dense_waypoints for _, dense_waypoints in sources)], axis=0
+            )
+            self._dense_all_route_ids = np.repeat(
+                np.array([route_id for route_id, _ in sources], dtype=np.int64),
+                [len(dense_waypoints) for _, dense_waypoints in sources],
+            )
+            self._dense_all_sources = sources
+
+        return self._dense_all, self._dense_all_route_ids
+
     def remove_selected_route(self):
         """
         Remove the currently selected route.
         """
         del self.routes[self.selected_route_id]
+        del self.sorted_ids[bisect.bisect_left(self.sorted_ids, self.selected_route_id)]
 
         if self.routes:
             self.selected_route_id = next(iter(self.routes.keys()))
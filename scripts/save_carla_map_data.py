@@ -7,7 +7,7 @@ It connects to the CARLA server, loads a selected map, and collects the followin
 - Stop sign locations: Positions of stop signs on the map.
 - Traffic light locations: Positions of traffic lights.
 
-The collected data is saved in a pickle file for each map, which can be loaded and used
+The collected data is saved in a .npz file and as .npy files for each map, which can be loaded and used
 by other parts of the application. This preprocessing step enhances efficiency by avoiding
 the need to query the CARLA server for map data during runtime, speeding up route and
 scenario creation processes.
@@ -18,12 +18,32 @@ Note: Make sure the CARLA server is running before executing this script.
 import numpy as np
 import carla
 import argparse
-import pickle
 import pathlib
 import os
 from tqdm import tqdm
 import time
 
+
+def waypoints_to_np(waypoints):
+    """
+    Copy the locations of the given CARLA waypoints into a preallocated array.
+
+    Args:
+        waypoints (list): A list of carla.Waypoint objects.
+
+    Returns:
+        np.array: The locations of the waypoints, shape [N, 3].
+    """
+    waypoints_np = np.empty((len(waypoints), 3), dtype=np.float64)
+    for i, wp in enumerate(waypoints):
+        location = wp.transform.location
+        waypoints_np[i, 0] = location.x
+        waypoints_np[i, 1] = location.y
+        waypoints_np[i, 2] = location.z
+
+    return waypoints_np
+
+
 # Parse command line arguments
 parser = argparse.ArgumentParser()
 parser.add_argument("--host", type=str, default="localhost", help="The host IP of the CARLA Server.")
@@ -50,7 +70,7 @@ client.set_timeout(120)
 
 # Get the list of available maps
 available_maps = client.get_available_maps()
-available_maps = sorted([x.split("/")[-1] for x in available_maps])
+available_maps = sorted(map(os.path.basename, available_maps))
 
 # Create the save path if it doesn't exist
 pathlib.Path(args.output_dir).mkdir(exist_ok=True, parents=True)
@@ -64,61 +84,60 @@ for map_name in tqdm(available_maps):
 
     # Get map waypoints and parking waypoints
     road_waypoints = carla_map.generate_waypoints(1)
-    road_waypoints_np = np.array(
-        [[wp.transform.location.x, wp.transform.location.y, wp.transform.location.z] for wp in road_waypoints]
-    )
-    road_waypoints_np = road_waypoints_np[:, :3]  # Keep only x and y coordinates
+    road_waypoints_np = np.empty((len(road_waypoints), 3), dtype=np.float64)
 
-    # Collect parking waypoints
+    # Collect the road and parking waypoints in a single pass over the road waypoints
+    parking_lane_type = carla.LaneType.Parking
     parking_waypoints = []
-    for wp in road_waypoints:
-        left_waypoint = wp.get_left_lane()
-        right_waypoint = wp.get_right_lane()
-        if (
-            left_waypoint is not None
-            and left_waypoint.lane_type == carla.LaneType.Parking
-            and not left_waypoint.is_junction
-        ):
-            parking_waypoints.append(left_waypoint)
-        if (
-            right_waypoint is not None
-            and right_waypoint.lane_type == carla.LaneType.Parking
-            and not right_waypoint.is_junction
-        ):
-            parking_waypoints.append(right_waypoint)
-    parking_waypoints_np = np.array(
-        [[wp.transform.location.x, wp.transform.location.y, wp.transform.location.z] for wp in parking_waypoints]
-    )
-    parking_waypoints_np = parking_waypoints_np.reshape((-1, 3)).astype("float")
+    for i, wp in enumerate(road_waypoints):
+        location = wp.transform.location
+        road_waypoints_np[i, 0] = location.x
+        road_waypoints_np[i, 1] = location.y
+        road_waypoints_np[i, 2] = location.z
+
+        for side_waypoint in (wp.get_left_lane(), wp.get_right_lane()):
+            if (
+                side_waypoint is not None
+                and side_waypoint.lane_type == parking_lane_type
+                and not side_waypoint.is_junction
+            ):
+                parking_waypoints.append(side_waypoint)
+    parking_waypoints_np = waypoints_to_np(parking_waypoints)
+
+    # Fetch the actors once, filtering them happens on the client
+    actors = carla_world.get_actors()
 
     # Collect stop signs
-    stop_signs = carla_world.get_actors().filter("*traffic.stop*")
-    stop_sign_centers = [x.get_transform().transform(x.trigger_volume.location) for x in stop_signs]
-    stop_sign_wps = [carla_map.get_waypoint(x) for x in stop_sign_centers]
-    stop_sign_centers_np = np.array(
-        [[x.transform.location.x, x.transform.location.y, x.transform.location.z] for x in stop_sign_wps]
-    ).astype("float")
+    stop_signs = actors.filter("*traffic.stop*")
+    stop_sign_wps = []
+    for stop_sign in stop_signs:
+        stop_sign_center = stop_sign.get_transform().transform(stop_sign.trigger_volume.location)
+        stop_sign_wps.append(carla_map.get_waypoint(stop_sign_center))
+    stop_sign_centers_np = waypoints_to_np(stop_sign_wps)
 
     # Collect traffic lights
-    traffic_lights = carla_world.get_actors().filter("*traffic.traffic_light*")
+    traffic_lights = actors.filter("*traffic.traffic_light*")
     traffic_light_wps = [x.get_affected_lane_waypoints() for x in traffic_lights]
     traffic_light_wps = [item for sublist in traffic_light_wps for item in sublist]
-    traffic_light_centers_np = np.array(
-        [[x.transform.location.x, x.transform.location.y, x.transform.location.z] for x in traffic_light_wps]
-    ).astype("float")
+    traffic_light_centers_np = waypoints_to_np(traffic_light_wps)
 
     # Calculate map dimensions
-    all_waypoints_np = np.concatenate([road_waypoints_np, parking_waypoints_np], axis=0)
+    all_waypoints_np = np.concatenate([road_waypoints_np, parking_waypoints_np], axis=0, dtype=np.float64)
     num_road_waypoints, num_parking_waypoints = road_waypoints_np.shape[0], parking_waypoints_np.shape[0]
 
-    # Save the data to a pickle file
+    # Save the data to a .npz file, which stores the raw array buffers
     data = {
         "stop_sign_centers_np": stop_sign_centers_np,
         "traffic_light_centers_np": traffic_light_centers_np,
         "all_waypoints_np": all_waypoints_np,
-        "num_road_waypoints": num_road_waypoints,
-        "num_parking_waypoints": num_parking_waypoints,
+        "num_road_waypoints": np.int64(num_road_waypoints),
+        "num_parking_waypoints": np.int64(num_parking_waypoints),
     }
 
-    with open(os.path.join(args.output_dir, f"{map_name}.pkl"), "wb") as f:
-        pickle.dump(data, f)
+    np.savez(os.path.join(args.output_dir, f"{map_name}.npz"), **data)
+
+    # Additionally save every array as .npy file, so the CarlaClient can memory-map them
+    npy_dir = os.path.join(args.output_dir, map_name)
+    pathlib.Path(npy_dir).mkdir(exist_ok=True)
+    for key, value in data.items():
+        np.save(os.path.join(npy_dir, f"{key}.npy"), np.asarray(value))
@@ -30,6 +30,7 @@ class ScenarioAttributeDialog(QDialog):
 
         self.scenario_type = scenario_type
         self.font_size = font_size
+        self._font = QFont("Arial", font_size)  # Shared by all labels and input widgets
 
         # Create main layout
         self.main_layout = QVBoxLayout()
@@ -70,45 +71,46 @@ class ScenarioAttributeDialog(QDialog):
         Set the scenario attributes based on the user input
         before closing the dialog.
         """
-        for i in range(len(self.scenario_attributes)):
-            attribute, attr_type, input_widgets = self.scenario_attributes[i]
+        new_attributes = []
+        for attribute, attr_type, input_widgets in self.scenario_attributes:
 
             if attr_type in ("bool", "value"):
                 line_edit = input_widgets
                 try:
                     value = int(line_edit.text())
-                    self.scenario_attributes[i] = (attribute, attr_type, value)
+                    new_attributes.append((attribute, attr_type, value))
                 except ValueError:
-                    self.scenario_attributes[i] = None
+                    pass  # Skip attributes without a valid input
 
             elif attr_type == "transform":
-                pass  # Not used in any scenario currently
+                # Not used in any scenario currently
+                new_attributes.append((attribute, attr_type, input_widgets))
 
             elif "location" in attr_type:
-                pass  # Must be done in the main window directly
+                # Must be done in the main window directly
+                new_attributes.append((attribute, attr_type, input_widgets))
 
             elif attr_type == "interval":
                 try:
                     line_edit_from, line_edit_to = input_widgets
                     from_value = int(line_edit_from.text())
                     to_value = int(line_edit_to.text())
-                    self.scenario_attributes[i] = (attribute, attr_type, [from_value, to_value])
+                    new_attributes.append((attribute, attr_type, [from_value, to_value]))
                 except ValueError:
-                    self.scenario_attributes[i] = None
+                    pass  # Skip attributes without a valid input
 
             elif attr_type == "choice":
                 try:
                     combo_box = input_widgets
                     direction = combo_box.currentText()
-                    self.scenario_attributes[i] = (attribute, attr_type, direction)
-                except:
-                    self.scenario_attributes[i] = None
+                    new_attributes.append((attribute, attr_type, direction))
+                except Exception:
+                    pass  # Skip attributes without a valid input
 
             else:
                 raise NotImplementedError(f"Type {attr_type} is not implemented yet")
 
-        # Remove None values from the scenario_attributes list
-        self.scenario_attributes = [attr for attr in self.scenario_attributes if attr is not None]
+        self.scenario_attributes = new_attributes
 
         self.close()
 
@@ -131,7 +133,7 @@ class ScenarioAttributeDialog(QDialog):
             label = QLabel(f"{attribute.upper()}: ")
             self.left_layout.addWidget(label)
 
-            font = QFont("Arial", self.font_size)
+            font = self._font
             label.setFont(font)
 
             line_edit = QLineEdit()
@@ -150,7 +152,7 @@ class ScenarioAttributeDialog(QDialog):
             pass  # Must be done in the main window directly
 
         elif attr_type == "interval":
-            font = QFont("Arial", self.font_size)
+            font = self._font
 
             label = QLabel(f"{attribute.upper()}: ")
             self.left_layout.addWidget(label)
@@ -178,7 +180,7 @@ class ScenarioAttributeDialog(QDialog):
             self.scenario_attributes.append((attribute, attr_type, (line_edit_from, line_edit_to)))
 
         elif attr_type == "choice":
-            font = QFont("Arial", self.font_size)
+            font = self._font
 
             label = QLabel(f"{attribute.upper()}: ")
             self.left_layout.addWidget(label)
@@ -1,19 +1,48 @@
 import sys
 from PyQt5.QtWidgets import (
-    QWidget,
-    QScrollBar,
-    QGridLayout,
     QLineEdit,
     QLabel,
     QDialog,
     QApplication,
-    QPushButton,
     QVBoxLayout,
-    QScrollArea,
+    QListView,
+    QAbstractItemView,
 )
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
 import config
 
 
+class ScenarioListModel(QAbstractListModel):
+    """
+    A list model of the sorted scenario names. The view only creates what is needed for the visible rows.
+    """
+
+    def __init__(self, scenario_types, parent=None):
+        super().__init__(parent)
+        # Sorted and lowercased once, so filtering doesn't sort or lowercase anything per keystroke
+        self._sorted_keys = sorted(scenario_types.keys())
+        self._sorted_keys_lower = [key.lower() for key in self._sorted_keys]
+        self._keys = self._sorted_keys
+
+    def set_filter_text(self, text):
+        """
+        Only show the scenarios that contain the text, ignoring the case.
+        """
+        text = text.lower()
+        self.beginResetModel()
+        self._keys = [key for key, key_lower in zip(self._sorted_keys, self._sorted_keys_lower) if text in key_lower]
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self._keys[index.row()]
+
+        return None
+
+
 class ScenarioSelectionDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -37,55 +66,21 @@ class ScenarioSelectionDialog(QDialog):
         self.filter_text_field.textChanged.connect(self.filter_available_scenarios)
         main_layout.addWidget(self.filter_text_field)
 
-        # Create a grid layout inside the scroll area
-        self.grid_layout = QGridLayout()
+        # The scenarios are shown in a list view, filtering only changes the rows of the model
+        self.scenario_model = ScenarioListModel(self.SCENARIO_TYPES, self)
 
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        main_layout.addWidget(scroll_area)
-
-        scroll_widget = QWidget()
-        scroll_widget.setLayout(self.grid_layout)
-
-        scroll_area.setWidget(scroll_widget)
-
-        scrollbar = QScrollBar()
-        scrollbar.setOrientation(1)  # Vertical orientation
-        scrollbar.setMaximum(100)  # Set the maximum value
-        main_layout.addWidget(scrollbar)
-
-        # Add scenario labels and buttons to the grid layou
-        self.list = []
-        self.update_scenario_list(self.SCENARIO_TYPES)
+        self.scenario_list_view = QListView()
+        self.scenario_list_view.setModel(self.scenario_model)
+        self.scenario_list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.scenario_list_view.setUniformItemSizes(True)
+        self.scenario_list_view.clicked.connect(lambda index: self.on_scenario_selected(index.data()))
+        main_layout.addWidget(self.scenario_list_view)
 
         self.setModal(True)
         self.exec_()
 
-    def update_scenario_list(self, scenario_types):
-        for i, scenario in enumerate(sorted(scenario_types.keys())):
-            scenario_label = QLabel(scenario)
-            select_button = QPushButton(">")
-            select_button.setFixedWidth(select_button.minimumSizeHint().width())
-            select_button.setMinimumHeight(
-                select_button.minimumSizeHint().height()
-            )  # Set minimum height to preferred height
-            select_button.clicked.connect(lambda _, scenario=scenario: self.on_scenario_selected(scenario))
-
-            self.list.append(select_button)
-            self.list.append(scenario_label)
-
-            self.grid_layout.addWidget(scenario_label, i, 0)
-            self.grid_layout.addWidget(select_button, i, 1)
-
     def filter_available_scenarios(self, text):
-        scenario_types = {key: value for (key, value) in self.SCENARIO_TYPES.items() if text.lower() in key.lower()}
-        for item in self.list:
-            self.grid_layout.removeWidget(item)
-            # Delete the button from memory
-            item.deleteLater()
-
-        self.list.clear()
-        self.update_scenario_list(scenario_types)
+        self.scenario_model.set_filter_text(text)
 
     def on_scenario_selected(self, scenario):
         self.selected_scenario = scenario
@@ -17,8 +17,6 @@ for route in routes:
     root.append(route)
 
     filename = f"{pathlib.Path(args.xml_file).name.replace('.xml', '')}_{id:02d}.xml"
-    with open(os.path.join(args.out_folder, filename), "wb") as f:
-        test = etree.tostring(new_tree, xml_declaration=True, encoding="utf-8", pretty_print=True)
-        f.write(test)
-    new_tree.write(os.path.join(args.out_folder, filename))
+    with open(os.path.join(args.out_folder, filename), "wb", buffering=1 << 20) as f:
+        new_tree.write(f, xml_declaration=True, encoding="utf-8", pretty_print=True)
     id += 1
@@ -8,22 +8,41 @@ points, and specifying scenario attributes. The tool also supports visualizing t
 and associated elements such as stop signs and traffic lights.
 """
 
+import bisect
+import contextlib
+import ctypes
+import os
 import sys
 from PyQt5.QtWidgets import (
     QLabel,
     QMessageBox,
     QFrame,
     QFileDialog,
-    QListWidgetItem,
     QApplication,
     QWidget,
     QPushButton,
     QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
+    QListView,
+    QAbstractItemView,
+    QOpenGLWidget,
+    QStackedWidget,
+)
+from PyQt5.QtCore import Qt, QTimer, QPoint, QPointF, QPointF, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import (
+    QPainter,
+    QColor,
+    QPen,
+    QPixmap,
+    QImage,
+    QFont,
+    QPolygon,
+    QPolygonF,
+    QSurfaceFormat,
+    QStaticText,
+    QOpenGLContext,
+    QOffscreenSurface,
 )
-from PyQt5.QtCore import Qt, QTimer, QPointF, QPointF
-from PyQt5.QtGui import QPainter, QColor, QPen, QPixmap, QColor
 import time
 from route_manager import RouteManager
 from carla_simulator_client import CarlaClient
@@ -36,6 +55,53 @@ import carla
 from scenario_selection_dialog import ScenarioSelectionDialog
 import config
 from scenario_attribute_dialog import ScenarioAttributeDialog
+from _kernels import project_clip
+
+
+def _np_to_qpolygonf(points, polygon=None):
+    """
+    Convert an array of points to a QPolygonF by copying the raw coordinates into its buffer,
+    without creating a QPointF object per point.
+
+    Args:
+        points (np.array): The points, shape [N, 2].
+        polygon (QPolygonF, optional): A polygon to reuse. Its buffer is only reallocated if it is too small.
+
+    Returns:
+        QPolygonF: The polygon with the N points.
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)  # QPointF stores two doubles
+    if polygon is None:
+        polygon = QPolygonF(len(points))
+    else:
+        polygon.fill(QPointF(), len(points))  # Resizes the polygon and keeps its capacity
+    if len(points):
+        ctypes.memmove(int(polygon.data()), points.ctypes.data, points.nbytes)
+
+    return polygon
+
+
+def _np_to_qpolygon(points, polygon=None):
+    """
+    Round an array of points to integer pixels and convert it to a QPolygon by copying the raw coordinates
+    into its buffer, without creating a QPoint object per point.
+
+    Args:
+        points (np.array): The points, shape [N, 2].
+        polygon (QPolygon, optional): A polygon to reuse. Its buffer is only reallocated if it is too small.
+
+    Returns:
+        QPolygon: The polygon with the N points.
+    """
+    points = np.rint(points).astype(np.int32)  # QPoint stores two ints
+    if polygon is None:
+        polygon = QPolygon(len(points))
+    else:
+        polygon.fill(QPoint(), len(points))  # Resizes the polygon and keeps its capacity
+    if len(points):
+        ctypes.memmove(int(polygon.data()), points.ctypes.data, points.nbytes)
+
+    return polygon
 
 
 class Separator(QWidget):
@@ -50,9 +116,40 @@ class Separator(QWidget):
         self.setFrameShadow(QFrame.Sunken)
 
 
-class Canvas(QWidget):
+def probe_opengl_samples(requested_samples=4):
+    """
+    Checks whether an OpenGL context can be created and made current, which fails e.g. on remote X or VMs without
+    OpenGL. Must be called after the QApplication was created.
+
+    Args:
+        requested_samples (int): The number of multisampling samples to ask for (default=4).
+
+    Returns:
+        int: The number of multisampling samples the context supports, 0 without multisampling.
+            None if no usable OpenGL context can be created.
+    """
+    surface_format = QSurfaceFormat()
+    surface_format.setSamples(requested_samples)
+
+    context = QOpenGLContext()
+    context.setFormat(surface_format)
+    if not context.create():
+        return None
+
+    surface = QOffscreenSurface()
+    surface.setFormat(context.format())
+    surface.create()
+    if not context.makeCurrent(surface):
+        return None
+    context.doneCurrent()
+
+    return min(requested_samples, max(0, context.format().samples()))
+
+
+class _CanvasMixin:
     """
     A canvas widget for displaying and interacting with the CARLA map, routes, and scenarios.
+    It is combined with QOpenGLWidget in Canvas and with QWidget in RasterCanvas.
     """
 
     def __init__(
@@ -80,6 +177,10 @@ class Canvas(QWidget):
 
         self.setMouseTracking(True)
 
+        # Every paint covers the whole canvas, so Qt doesn't need to erase the background before
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+
         self.scaling = 1.0
         self.global_scaling = 1.0
         self.offset = np.array([0.0, 0.0])
@@ -93,6 +194,14 @@ class Canvas(QWidget):
         self.stop_sign_pixmap = QPixmap("scripts/images/stop_sign_icon.png")
         self.traffic_light_pixmap = QPixmap("scripts/images/traffic_light_icon.png")
 
+        # Icons scaled to a given height in pixels, cleared when too many zoom levels were visited
+        self._stop_cache = {}
+        self._tl_cache = {}
+        self._max_cached_icon_sizes = 64
+
+        # Laid out scenario labels, keyed by the scenario type
+        self._scenario_static_texts = {}
+
         self.road_waypoints_np = None
         self.parking_waypoints_np = None
         self.traffic_light_centers_np = None
@@ -103,7 +212,41 @@ class Canvas(QWidget):
         self.map_size = None
         self.closest_map_coord_screen_coords = None
         self.selected_route = None
+        # Dense waypoints of the routes that are not selected, with the array and the route ID they were selected from
+        self.other_routes_dense_waypoints = np.empty((0, 3), dtype=np.float32)
+        self._other_routes_source = None
+        self._other_routes_selected_id = None
         self.last_mouse_pos = QPointF(0, 0)
+        # Last cursor position of which the closest waypoint was not computed yet
+        self._pending_mouse_pos = None
+        self._mouse_dirty = False
+        # Whether anything drawn changed since the last paint
+        self._dirty = True
+
+        # Screen coordinates of the drawn arrays, stored as (source array, view, screen coordinates) per key
+        self._proj_cache = {}
+
+        # Buffers for the projected points, keyed by the drawn array and grown when needed
+        self._scratch = {}
+
+        # Polygons that pass the route points to QPainter, reused across frames
+        self._dense_polygon = QPolygonF(max_drawn_points)
+        self._interpolated_polygon = QPolygonF(max_drawn_points)
+        self._other_routes_polygon = QPolygon(max_drawn_points)
+
+        # Screen coordinates inside the window of the static map elements for the current view
+        self._road_screen = None
+        self._parking_screen = None
+        self._stop_screen = None
+        self._tl_screen = None
+        self._static_layer = None  # QImage with the static map elements drawn at the current view
+
+        # Uniform grid over all waypoints for the closest waypoint search. The waypoint indices are sorted by the key
+        # of their cell, key = cell_x * stride + cell_y + 1, so the waypoints of a cell are one slice of the order.
+        self._bucket_size = 2.0  # meters
+        self._bucket_keys = np.empty(0, dtype=np.int64)  # The sorted cell keys of the waypoints
+        self._bucket_order = np.empty(0, dtype=np.int64)  # The waypoint indices in the order of the keys
+        self._bucket_stride = 1
 
         # Define colors
         self.STOP_SIGN_COLOR = QColor(180, 50, 50)
@@ -141,18 +284,22 @@ class Canvas(QWidget):
         Updates the canvas when there is no mouse movement for a certain period of time.
         This method interpolates the route between the last waypoint and the closest map coordinate.
         """
+        self.flush_pending_mouse_move()
+
         if (
-            not self.location_transform_attributes
-            and not self.interpolated_trace
+            self.selected_route is not None
+            and not self.location_transform_attributes
+            and len(self.interpolated_trace) == 0
             and self.closest_map_coord_screen_coords is not None
             and time.time() - self.since_last_mouse_movement > self.interpolating_after_ticks_of_no_mouse_movement
         ):
             closest_map_loc = self.screen_coords_to_world_coords(self.closest_map_coord_screen_coords[None])[0]
             closest_map_loc = carla.Location(closest_map_loc[0], closest_map_loc[1])
             self.interpolated_trace = self.selected_route.interpolate_from_last_wp(closest_map_loc)
+            self._dirty = True
 
         current_time = time.time()
-        if current_time - self.last_screen_update > self.fps_inv:
+        if self._dirty and current_time - self.last_screen_update > self.fps_inv:
             self.last_screen_update = current_time
             self.update()
 
@@ -160,26 +307,63 @@ class Canvas(QWidget):
         """
         Updates the map data from the CARLA client, including waypoints, traffic light centers, stop sign centers, and map dimensions.
         """
-        self.road_waypoints_np = self.carla_client.road_waypoints_np
-        self.parking_waypoints_np = self.carla_client.parking_waypoints_np
-        self.traffic_light_centers_np = self.carla_client.traffic_light_centers_np
-        self.stop_sign_centers_np = self.carla_client.stop_sign_centers_np
-        self.min_coords = self.carla_client.min_coords
+        # Single precision halves the memory traffic of the projections and is exact enough for drawing
+        self.road_waypoints_np = np.ascontiguousarray(self.carla_client.road_waypoints_np, dtype=np.float32)
+        self.parking_waypoints_np = np.ascontiguousarray(self.carla_client.parking_waypoints_np, dtype=np.float32)
+        self.traffic_light_centers_np = np.ascontiguousarray(
+            self.carla_client.traffic_light_centers_np, dtype=np.float32
+        )
+        self.stop_sign_centers_np = np.ascontiguousarray(self.carla_client.stop_sign_centers_np, dtype=np.float32)
+        self.min_coords = np.asarray(self.carla_client.min_coords, dtype=np.float32)
+
+        # The static points relative to min_coords, so their projections do not subtract it again for every point
+        self.road_waypoints_shifted = self.road_waypoints_np[:, :2] - self.min_coords[None, :2]
+        self.parking_waypoints_shifted = self.parking_waypoints_np[:, :2] - self.min_coords[None, :2]
+        self.traffic_light_centers_shifted = self.traffic_light_centers_np[:, :2] - self.min_coords[None, :2]
+        self.stop_sign_centers_shifted = self.stop_sign_centers_np[:, :2] - self.min_coords[None, :2]
+
         self.map_width = self.carla_client.map_width
         self.map_height = self.carla_client.map_height
         self.map_size = self.carla_client.map_size
         self.interpolated_trace = []
+        self._proj_cache.clear()
+        self._dirty = True
 
         self.all_waypoints_np = np.concatenate([self.road_waypoints_np, self.parking_waypoints_np], axis=0)
-        self.tree = cKDTree(self.all_waypoints_np)
+        self.all_waypoints_shifted = np.concatenate(
+            [self.road_waypoints_shifted, self.parking_waypoints_shifted], axis=0
+        )
+        # The sliding midpoint build is much faster than the median build and works well for the waypoint data
+        self.tree = cKDTree(self.all_waypoints_np, leafsize=32, balanced_tree=False, compact_nodes=False)
+        self.build_waypoint_buckets()
 
         self.closest_map_coord_screen_coords = self.road_waypoints_np[0, :2]
+        self._invalidate_static_layer()
 
     def update_selected_route(self, selected_route):
         """
         Updates the currently selected route and resets the canvas view.
         """
         self.selected_route = selected_route
+        self.interpolated_trace = []  # The trace was interpolated from the last waypoint of the previous route
+        self._dirty = True
+
+    def get_other_routes_dense_waypoints(self):
+        """
+        Returns the dense waypoints of all routes except the selected one. They are only selected again from the
+        concatenated waypoints of the route manager when those or the selected route changed.
+
+        Returns:
+            np.array: The dense waypoints of the other routes, shape [N, 3].
+        """
+        dense_all, route_ids = self.route_manager.get_dense_waypoints_of_all_routes()
+        selected_route_id = self.route_manager.selected_route_id
+        if dense_all is not self._other_routes_source or selected_route_id != self._other_routes_selected_id:
+            self.other_routes_dense_waypoints = dense_all[route_ids != selected_route_id]
+            self._other_routes_source = dense_all
+            self._other_routes_selected_id = selected_route_id
+
+        return self.other_routes_dense_waypoints
 
     def reset_map_offset_and_scaling(self):
         if self.map_size is not None:
@@ -191,11 +375,112 @@ class Canvas(QWidget):
             self.offset = np.array([0.0, 0.0])
             self.scaling = 1.0
             self.update_global_scaling(self.size())
+            self._invalidate_static_layer()
+
+    def _invalidate_static_layer(self):
+        """
+        Marks the static map elements to be projected and drawn again on the next paint. Must be called whenever the
+        scaling, the offsets or the window size change. While panning, many mouse moves arrive per frame, so the
+        projection is not done here but only once per painted frame.
+        """
+        if self.min_coords is not None:
+            self._static_layer = None
+            self._dirty = True
+
+    def _reproject_static(self):
+        """
+        Transforms the road and parking waypoints, stop signs and traffic lights to the screen coordinates inside the
+        window.
+        """
+        self._road_screen = self.project_inside_window(self.road_waypoints_shifted, True, "road")
+        self._parking_screen = self.project_inside_window(self.parking_waypoints_shifted, True, "parking")
+        self._stop_screen = self.project_inside_window(self.stop_sign_centers_shifted, True, "stop_signs")
+        self._tl_screen = self.project_inside_window(self.traffic_light_centers_shifted, True, "traffic_lights")
+
+    def _render_static_layer(self):
+        """
+        Draws the road and parking waypoints, stop signs and traffic lights of the current view into an off-screen
+        image. It is copied to the canvas on every frame and only redrawn after the view changed. A premultiplied
+        QImage is always drawn with the raster engine, independent of the platform's pixmap backend.
+        """
+        self._reproject_static()
+
+        pixel_ratio = self.devicePixelRatioF()
+        self._static_layer = QImage(self.size() * pixel_ratio, QImage.Format_ARGB32_Premultiplied)
+        self._static_layer.setDevicePixelRatio(pixel_ratio)
+        self._static_layer.fill(self.palette().color(self.backgroundRole()))
+
+        painter = QPainter(self._static_layer)
+
+        # Points up to 2 pixels wide look the same without antialiasing, which is much cheaper to rasterize
+        road_wps_width = float(max(1, self.global_scaling * self.scaling * self.ROAD_WPS_SIZE))
+        painter.setRenderHint(QPainter.Antialiasing, road_wps_width > 2)
+
+        n_skip = max(1, (self._road_screen.shape[0] + self._parking_screen.shape[0]) // self.max_drawn_points)
+        # Integer points halve the copied bytes, sub-pixel positions are not visible for the small road points
+        road_waypoints = _np_to_qpolygon(self._road_screen[::n_skip])
+        parking_waypoints = _np_to_qpolygon(self._parking_screen[::n_skip])
+
+        painter.setPen(QPen(self.MAP_COLOR, road_wps_width, Qt.DashDotLine, Qt.RoundCap))
+        painter.drawPoints(road_waypoints)
+
+        painter.setPen(QPen(self.PARKING_LOT_COLOR, road_wps_width, Qt.DashDotLine, Qt.RoundCap))
+        painter.drawPoints(parking_waypoints)
+
+        # The icons are drawn unscaled at whole pixels, so antialiasing doesn't change them
+        painter.setRenderHint(QPainter.Antialiasing, False)
+
+        factor = max(1, int(self.SCALING_STOP_SIGN * self.scaling * self.global_scaling))
+        resized_stop_sign_pixmap = self.get_scaled_icon(self._stop_cache, self.stop_sign_pixmap, factor)
+        resized_stop_sign_pixmap_size = np.array(
+            [resized_stop_sign_pixmap.size().width(), resized_stop_sign_pixmap.size().height()], dtype="float"
+        )
+        stop_sign_locations = np.rint(self._stop_screen - resized_stop_sign_pixmap_size[None] / 2.0).astype(np.int32)
+        for x, y in stop_sign_locations.tolist():
+            painter.drawPixmap(x, y, resized_stop_sign_pixmap)
+
+        factor = max(1, int(self.SCALING_TRAFFIC_LIGHT * self.scaling * self.global_scaling))
+        resized_traffic_light_pixmap = self.get_scaled_icon(self._tl_cache, self.traffic_light_pixmap, factor)
+        resized_traffic_light_pixmap_size = np.array(
+            [resized_traffic_light_pixmap.size().width(), resized_traffic_light_pixmap.size().height()],
+            dtype="float",
+        )
+        traffic_light_locations = self._tl_screen - resized_traffic_light_pixmap_size[None] / 2.0
+        traffic_light_locations = np.rint(traffic_light_locations).astype(np.int32)
+        for x, y in traffic_light_locations.tolist():
+            painter.drawPixmap(x, y, resized_traffic_light_pixmap)
+
+        painter.end()
+
+    def get_scaled_icon(self, cache, pixmap, height):
+        """
+        Returns the icon scaled to the given height. Each height is only scaled once.
+
+        Args:
+            cache (dict): The already scaled versions of the icon, keyed by their height.
+            pixmap (QPixmap): The icon in its original size.
+            height (int): The height of the scaled icon in pixels.
+
+        Returns:
+            QPixmap: The scaled icon.
+        """
+        scaled_pixmap = cache.get(height)
+        if scaled_pixmap is None:
+            if len(cache) >= self._max_cached_icon_sizes:
+                cache.clear()
+            scaled_pixmap = cache[height] = pixmap.scaledToHeight(height, Qt.SmoothTransformation)
+
+        return scaled_pixmap
 
     def paintEvent(self, event):
         """
         Handles the paintEvent to draw the map, routes, and associated elements on the canvas.
         """
+        painter = QPainter(self)
+
+        # The canvas is opaque and the OpenGL framebuffer doesn't get filled with the background either
+        painter.fillRect(self.rect(), self.palette().color(self.backgroundRole()))
+
         if not (
             self.selected_route is None
             or self.road_waypoints_np is None
@@ -203,78 +488,37 @@ class Canvas(QWidget):
             or self.traffic_light_centers_np is None
             or self.stop_sign_centers_np is None
         ):
-            painter = QPainter(self)
             painter.setRenderHint(QPainter.Antialiasing)
 
-            road_waypoints = self.world_coords_to_screen_coords(self.road_waypoints_np[:, :2])
-            road_waypoints = self.select_coords_inside_window(road_waypoints)
-            parking_waypoints = self.world_coords_to_screen_coords(self.parking_waypoints_np[:, :2])
-            parking_waypoints = self.select_coords_inside_window(parking_waypoints)
-            sparse_waypoints = np.array(self.selected_route.waypoints).reshape((-1, 3))[:, :2]
-            sparse_waypoints = self.world_coords_to_screen_coords(sparse_waypoints)
-            sparse_waypoints = self.select_coords_inside_window(sparse_waypoints)
-            scenario_trigger_points = np.array(self.selected_route.scenario_trigger_points).reshape((-1, 3))[:, :2]
+            if self._static_layer is None:
+                self._render_static_layer()
+            painter.drawImage(0, 0, self._static_layer)
+
+            sparse_waypoints = np.asarray(self.selected_route.waypoints).reshape((-1, 3))
+            sparse_waypoints = self.project_inside_window(sparse_waypoints, scratch_key="sparse")
+            scenario_trigger_points = np.array(self.selected_route.scenario_trigger_points).reshape((-1, 2))
             scenario_trigger_points = self.world_coords_to_screen_coords(scenario_trigger_points)
-            dense_waypoints = np.array(self.selected_route.dense_waypoints).reshape((-1, 3))[:, :2]
-            dense_waypoints = self.world_coords_to_screen_coords(dense_waypoints)
-            dense_waypoints = self.select_coords_inside_window(dense_waypoints)
-            interpolated_trace = np.array(self.interpolated_trace).reshape((-1, 3))[:, :2]
-            interpolated_trace = self.world_coords_to_screen_coords(interpolated_trace)
-            interpolated_trace = self.select_coords_inside_window(interpolated_trace)
-
-            other_routes = [route for route in self.route_manager.routes.values()]
-            other_routes_dense_points = [np.array(route.dense_waypoints).reshape((-1, 3)) for route in other_routes]
-            if not other_routes_dense_points:
-                other_routes_dense_points = [[]]
-            other_routes_dense_points = np.concatenate(other_routes_dense_points, axis=0).reshape((-1, 3))
-            other_routes_dense_points = other_routes_dense_points[:, :2]
-            other_routes_dense_points = self.world_coords_to_screen_coords(other_routes_dense_points)
-            other_routes_dense_points = self.select_coords_inside_window(other_routes_dense_points)
+            dense_waypoints = self._project_cached(self.selected_route.dense_waypoints, "dense")
+            interpolated_trace = np.asarray(self.interpolated_trace).reshape((-1, 3))
+            interpolated_trace = self.project_inside_window(interpolated_trace, scratch_key="interpolated")
+
+            other_routes_dense_points = self._project_cached(self.get_other_routes_dense_waypoints(), "other_routes")
 
             n_skip = max(
                 1,
-                (
-                    road_waypoints.shape[0]
-                    + parking_waypoints.shape[0]
-                    + dense_waypoints.shape[0]
-                    + interpolated_trace.shape[0]
-                    + other_routes_dense_points.shape[0]
-                )
+                (dense_waypoints.shape[0] + interpolated_trace.shape[0] + other_routes_dense_points.shape[0])
                 // self.max_drawn_points,
             )
-            road_waypoints = road_waypoints[::n_skip]
-            parking_waypoints = parking_waypoints[::n_skip]
             dense_waypoints = dense_waypoints[::n_skip]
             interpolated_trace = interpolated_trace[::n_skip]
             other_routes_dense_points = other_routes_dense_points[::n_skip]
 
-            road_waypoints = [QPointF(x, y) for (x, y) in road_waypoints.tolist()]
-            parking_waypoints = [QPointF(x, y) for (x, y) in parking_waypoints.tolist()]
             sparse_waypoints = [QPointF(x, y) for (x, y) in sparse_waypoints.tolist()]
-            dense_waypoints = [QPointF(x, y) for (x, y) in dense_waypoints.tolist()]
+            dense_waypoints = _np_to_qpolygonf(dense_waypoints, self._dense_polygon)
             scenario_trigger_points_ = [QPointF(x, y) for (x, y) in scenario_trigger_points.tolist()]
-            interpolated_trace = [QPointF(x, y) for (x, y) in interpolated_trace.tolist()]
-            other_routes_dense_points = [QPointF(x, y) for (x, y) in other_routes_dense_points.tolist()]
-
-            painter.setPen(
-                QPen(
-                    self.MAP_COLOR,
-                    max(1, self.global_scaling * self.scaling * self.ROAD_WPS_SIZE),
-                    Qt.DashDotLine,
-                    Qt.RoundCap,
-                )
-            )
-            painter.drawPoints(road_waypoints)
-
-            painter.setPen(
-                QPen(
-                    self.PARKING_LOT_COLOR,
-                    max(1, self.global_scaling * self.scaling * self.ROAD_WPS_SIZE),
-                    Qt.DashDotLine,
-                    Qt.RoundCap,
-                )
-            )
-            painter.drawPoints(parking_waypoints)
+            interpolated_trace = _np_to_qpolygonf(interpolated_trace, self._interpolated_polygon)
+            # Sub-pixel positions are not visible for the thin points of the other routes
+            other_routes_dense_points = _np_to_qpolygon(other_routes_dense_points, self._other_routes_polygon)
 
             painter.setPen(
                 QPen(
@@ -343,29 +587,6 @@ class Canvas(QWidget):
             )
             painter.drawPoints(scenario_trigger_points_)
 
-            factor = max(1, int(self.SCALING_STOP_SIGN * self.scaling * self.global_scaling))
-            resized_stop_sign_pixmap = self.stop_sign_pixmap.scaledToHeight(factor)
-            stop_sign_locations = self.world_coords_to_screen_coords(self.stop_sign_centers_np)
-            stop_sign_locations = self.select_coords_inside_window(stop_sign_locations)
-            resized_stop_sign_pixmap_size = np.array(
-                [resized_stop_sign_pixmap.size().width(), resized_stop_sign_pixmap.size().height()], dtype="float"
-            )
-            stop_sign_locations = stop_sign_locations - resized_stop_sign_pixmap_size[None] / 2.0
-            for x, y in stop_sign_locations:
-                painter.drawPixmap(int(round(x)), int(round(y)), resized_stop_sign_pixmap)
-
-            factor = max(1, int(self.SCALING_TRAFFIC_LIGHT * self.scaling * self.global_scaling))
-            resized_traffic_light_pixmap = self.traffic_light_pixmap.scaledToHeight(factor)
-            traffic_light_locations = self.world_coords_to_screen_coords(self.traffic_light_centers_np)
-            traffic_light_locations = self.select_coords_inside_window(traffic_light_locations)
-            resized_traffic_light_pixmap_size = np.array(
-                [resized_traffic_light_pixmap.size().width(), resized_traffic_light_pixmap.size().height()],
-                dtype="float",
-            )
-            traffic_light_locations = traffic_light_locations - resized_traffic_light_pixmap_size[None] / 2.0
-            for x, y in traffic_light_locations:
-                painter.drawPixmap(int(round(x)), int(round(y)), resized_traffic_light_pixmap)
-
             painter.setPen(
                 QPen(
                     self.SCENARIO_COLOR,
@@ -376,8 +597,12 @@ class Canvas(QWidget):
             )
             scenario_types = self.selected_route.scenario_types
             p = max(self.SCALING_SPARSE_ROUTE, self.global_scaling * self.scaling * self.SCALING_SPARSE_ROUTE)
-            for (x, y), scenario_type in zip(scenario_trigger_points, scenario_types):
-                painter.drawText(int(round(x + p)), int(round(y - p)), scenario_type)
+            ascent = painter.fontMetrics().ascent()  # A static text is placed by its top left, not its baseline
+            for (x, y), scenario_type in zip(scenario_trigger_points.tolist(), scenario_types):
+                static_text = self._scenario_static_texts.get(scenario_type)
+                if static_text is None:
+                    static_text = self._scenario_static_texts[scenario_type] = QStaticText(scenario_type)
+                painter.drawStaticText(int(round(x + p)), int(round(y - p)) - ascent, static_text)
 
             closest_map_coord_screen_coords = [
                 QPointF(self.closest_map_coord_screen_coords[0], self.closest_map_coord_screen_coords[1])
@@ -392,12 +617,16 @@ class Canvas(QWidget):
             )
             painter.drawPoints(closest_map_coord_screen_coords)
 
+        self._dirty = False
+
     def wheelEvent(self, event):
         """
         Handles mouse wheel events for zooming in and out on the canvas.
         """
+        self._dirty = True
         self.since_last_mouse_movement = time.time()
         self.interpolated_trace = []
+        self.flush_pending_mouse_move()  # The zoom is centered on the closest map coordinate to the cursor
 
         window_size = self.size()
         window_size = np.array([window_size.width(), window_size.height()], dtype="float")
@@ -419,6 +648,7 @@ class Canvas(QWidget):
             self.offset, window_size - 2 * self.default_offset - self.global_scaling * self.scaling * self.map_size
         )
         self.offset = np.minimum(self.offset, 0)
+        self._invalidate_static_layer()
 
         self.compute_closest_map_coord_in_screen_coords(event.pos())
 
@@ -426,6 +656,8 @@ class Canvas(QWidget):
         """
         Handles mouse press events on the canvas.
         """
+        self._dirty = True  # Waypoints or scenarios might be added or removed
+        self.flush_pending_mouse_move()
         if event.button() == Qt.MiddleButton:
             self.panning = True
             self.last_mouse_pos = event.pos()
@@ -491,7 +723,7 @@ class Canvas(QWidget):
             scenario_type = self.location_transform_attributes[0]
             first_attribute = self.location_transform_attributes[1][0]
             self.parent_obj.label_add_location.setText(f"Select {first_attribute} for {scenario_type}")
-            self.parent_obj.label_add_location.setVisible(True)
+            self.parent_obj.add_location_stack.setCurrentWidget(self.parent_obj.label_add_location)
 
     def add_location_data_to_scenario(self, pos):
         """
@@ -538,15 +770,25 @@ class Canvas(QWidget):
         self.parent_obj.items_list.setEnabled(True)
         self.parent_obj.add_route_button.setEnabled(True)
         self.parent_obj.remove_route_button.setEnabled(True)
-        self.parent_obj.label_add_location.setVisible(False)
+        self.parent_obj.add_location_stack.setCurrentIndex(0)
 
         self.selected_route.add_location_transform_attributes_to_last_scenario(self.location_transform_attributes[1:])
         self.location_transform_attributes.clear()
+        self._dirty = True
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MiddleButton:
             self.panning = False
 
+    def flush_pending_mouse_move(self):
+        """
+        Computes the closest map coordinate for the last mouse move, if it wasn't computed yet. Must be called before
+        closest_map_coord_screen_coords is read, since mouse moves only store their position.
+        """
+        if self._mouse_dirty:
+            self._mouse_dirty = False
+            self.compute_closest_map_coord_in_screen_coords(self._pending_mouse_pos)
+
     def compute_closest_map_coord_in_screen_coords(self, mouse_location_screen_coord):
         if self.min_coords is not None:
             mouse_location_screen_coord = np.array(
@@ -555,11 +797,16 @@ class Canvas(QWidget):
             self.closest_map_coord_screen_coords = self.get_closest_road_wp_in_screen_coord(
                 mouse_location_screen_coord
             )
+            self._dirty = True
 
     def mouseMoveEvent(self, event):
         self.since_last_mouse_movement = time.time()
         self.interpolated_trace = []
-        self.compute_closest_map_coord_in_screen_coords(event.pos())
+
+        # Mouse moves arrive much faster than the frame rate, so the closest waypoint is only computed once per frame
+        self._pending_mouse_pos = event.pos()
+        self._mouse_dirty = True
+        self._dirty = True
 
         if self.panning:
             diff = event.pos() - self.last_mouse_pos
@@ -577,12 +824,14 @@ class Canvas(QWidget):
             )
 
             self.last_mouse_pos = event.pos()
+            self._invalidate_static_layer()
 
         # self.update()
 
     def resizeEvent(self, event):
         self.since_last_mouse_movement = time.time()
         self.interpolated_trace = []
+        self._dirty = True
         self.update_global_scaling(event.size())
 
         if self.map_size is not None:
@@ -596,6 +845,7 @@ class Canvas(QWidget):
             self.map_offset = np.maximum(
                 0, (window_size - 2 * self.default_offset - self.scaling * self.global_scaling * self.map_size) / 2
             )
+            self._invalidate_static_layer()
 
         self.compute_closest_map_coord_in_screen_coords(self.last_mouse_pos)
         # self.update()
@@ -612,24 +862,164 @@ class Canvas(QWidget):
                 0, (window_size - 2 * self.default_offset - self.scaling * self.global_scaling * self.map_size) / 2
             )
 
+    def build_waypoint_buckets(self):
+        """
+        Sorts the indices of all waypoints by the cells of a uniform grid with a cell size of self._bucket_size.
+        Only two flat arrays are built instead of one array per cell, so this is fast even for the largest maps.
+        """
+        cells = np.floor(self.all_waypoints_shifted / self._bucket_size).astype(np.int64)
+
+        # The shifted coordinates are not negative. One spare column on both sides keeps the 3 cells of a row
+        # that are searched from reaching into the neighboring rows.
+        self._bucket_stride = int(cells[:, 1].max()) + 3 if len(cells) else 1
+        keys = cells[:, 0] * self._bucket_stride + cells[:, 1] + 1
+
+        self._bucket_order = np.argsort(keys, kind="stable")
+        self._bucket_keys = keys[self._bucket_order]
+
+    def query_closest_waypoint_idx(self, world_coord):
+        """
+        Finds the index of the waypoint closest to the given world coordinate. Only the waypoints in the 3x3 grid cells
+        around the location are searched. If none of them is within one cell size, the KD-tree is queried instead.
+
+        Args:
+            world_coord (np.array): The x and y world coordinate, shape [2].
+
+        Returns:
+            int: The index into self.all_waypoints_np.
+        """
+        cell_x, cell_y = np.floor((world_coord - self.min_coords[:2]) / self._bucket_size).astype(np.int64).tolist()
+
+        candidates = []
+        column_start, column_end = max(cell_y, 0), min(cell_y + 3, self._bucket_stride)
+        if column_start < column_end:
+            for dx in (-1, 0, 1):
+                # The cells (cell_x + dx, cell_y - 1 ... cell_y + 1) have consecutive keys
+                row_key = (cell_x + dx) * self._bucket_stride
+                start, end = np.searchsorted(self._bucket_keys, (row_key + column_start, row_key + column_end))
+                if start < end:
+                    candidates.append(self._bucket_order[start:end])
+
+        if candidates:
+            candidates = np.concatenate(candidates)
+            diff = self.all_waypoints_np[candidates, :2] - world_coord[None]
+            dist2 = np.einsum("ij,ij->i", diff, diff)
+            best = dist2.argmin()
+
+            # Any waypoint outside of the searched cells is farther away than one cell size
+            if dist2[best] <= self._bucket_size**2:
+                return int(candidates[best])
+
+        _, idx = self.tree.query(world_coord)
+
+        return idx
+
     # get the closest world coordinate
     def get_closest_road_wp_in_screen_coord(self, mouse_location_screen_coord):
         mouse_location_world_coord = self.screen_coords_to_world_coords(mouse_location_screen_coord[None])[0]
-        _, idx = self.tree.query(mouse_location_world_coord)
+        idx = self.query_closest_waypoint_idx(mouse_location_world_coord)
         closest_map_wp_world_coord = self.all_waypoints_np[idx]
         closest_map_wp_screen_coord = self.world_coords_to_screen_coords(closest_map_wp_world_coord[None])[0]
 
         return closest_map_wp_screen_coord
 
+    def _project_cached(self, world_coords, key):
+        """
+        Transform world coordinates to the screen coordinates inside the window. The result is reused as long as
+        the same array is drawn with the same scaling, offsets and window size.
+
+        Args:
+            world_coords (np.array): The world coordinates, shape [N, 2] or [N, 3]. Only x and y are used.
+            key (str): The name of the drawn array.
+
+        Returns:
+            np.array: The screen coordinates inside the window, shape [M, 2].
+        """
+        window_size = self.size()
+        view = (
+            self.scaling,
+            self.global_scaling,
+            *self.offset.tolist(),
+            *self.map_offset.tolist(),
+            window_size.width(),
+            window_size.height(),
+        )
+
+        cached = self._proj_cache.get(key)
+        if cached is not None and cached[0] is world_coords and cached[1] == view:
+            return cached[2]
+
+        screen_coords = self.project_inside_window(world_coords, scratch_key=key)
+        self._proj_cache[key] = (world_coords, view, screen_coords)
+
+        return screen_coords
+
+    def project_inside_window(self, world_coords, shifted=False, scratch_key=None):
+        """
+        Transforms world coordinates to screen coordinates and keeps only the points inside the window,
+        in a single pass over the points.
+
+        Args:
+            world_coords (np.array): The world coordinates, shape [N, 2] or [N, 3]. Only x and y are used.
+            shifted (bool): Whether min_coords was already subtracted from the world coordinates.
+            scratch_key (str, optional): If given, the result is written into the scratch buffer with this name,
+                which is reused by the next call with the same name.
+
+        Returns:
+            np.array: The screen coordinates inside the window, shape [M, 2], float32.
+        """
+        scale = self.global_scaling * self.scaling
+        offset = self.default_offset + self.offset + self.map_offset
+        if not shifted:
+            # In float64, the float32 min_coords would otherwise keep the product in float32
+            offset = offset - scale * self.min_coords.astype(np.float64)
+        window_size = self.size()
+
+        if scratch_key is None:
+            screen_coords = np.empty((len(world_coords), 2), dtype=np.float32)
+        else:
+            screen_coords = self.get_scratch_buffer(scratch_key, len(world_coords))
+        count = project_clip(
+            world_coords,
+            float(scale),
+            float(offset[0]),
+            float(offset[1]),
+            float(window_size.width()),
+            float(window_size.height()),
+            screen_coords,
+        )
+
+        return screen_coords[:count]
+
+    def get_scratch_buffer(self, key, n):
+        """
+        Returns a float32 buffer for n screen coordinates, which is only reallocated when it is too small.
+
+        Args:
+            key (str): The name of the buffer.
+            n (int): The number of points.
+
+        Returns:
+            np.array: The buffer, shape [n, 2].
+        """
+        buffer = self._scratch.get(key)
+        if buffer is None or len(buffer) < n:
+            capacity = n if buffer is None else max(n, 2 * len(buffer))
+            buffer = self._scratch[key] = np.empty((capacity, 2), dtype=np.float32)
+
+        return buffer[:n]
+
     def world_coords_to_screen_coords(self, world_coords):
         # transforms carla world coordinates to screen coordinates
         # shape: [N, 2]: np.array
-        screen_coords = self.global_scaling * self.scaling * (world_coords - self.min_coords[None, :])
-        screen_coords += self.default_offset
-        screen_coords += self.offset[None, :]
-        screen_coords += self.map_offset[None, :]
+        # min_coords is subtracted before scaling and the result is only rounded to float32 at the end. Scaling the
+        # large world coordinates first would cost float32 its sub-pixel precision when zoomed in on large maps.
+        scale = self.global_scaling * self.scaling
+        screen_coords = np.subtract(world_coords, self.min_coords, dtype=np.float64)
+        screen_coords *= scale
+        screen_coords += self.default_offset + self.offset + self.map_offset
 
-        return screen_coords
+        return screen_coords.astype(np.float32)
 
     def screen_coords_to_world_coords(self, screen_coords):
         # transforms screen coordinates to carla world coordinates
@@ -642,24 +1032,88 @@ class Canvas(QWidget):
 
         return world_coords
 
-    def select_coords_inside_window(self, screen_coords):
-        window_size = self.size()
-        window_size = np.array([window_size.width(), window_size.height()], dtype="float")
 
-        flag = (
-            (screen_coords[:, 0] >= 0)
-            & (screen_coords[:, 1] >= 0)
-            & (screen_coords[:, 0] <= window_size[0])
-            & (screen_coords[:, 1] <= window_size[1])
-        )
+class Canvas(_CanvasMixin, QOpenGLWidget):
+    """
+    The canvas rendered with OpenGL, so QPainter rasterizes the thousands of drawn points on the GPU.
+    """
+
+    def __init__(self, carla_client, samples=4, **kwargs):
+        """
+        Args:
+            carla_client (CarlaClient): The CARLA client instance.
+            samples (int): The number of multisampling samples, 0 to disable multisampling (default=4).
+            **kwargs: The remaining arguments of _CanvasMixin.
+        """
+        super().__init__(carla_client, **kwargs)
+
+        # Multisampling replaces the antialiasing of the raster paint engine
+        surface_format = QSurfaceFormat()
+        surface_format.setSamples(samples)
+        self.setFormat(surface_format)
 
-        filtered_screen_coords = screen_coords[flag]
 
-        return filtered_screen_coords
+class RasterCanvas(_CanvasMixin, QWidget):
+    """
+    The canvas rendered by the raster paint engine, used if no OpenGL context can be created.
+    """
+
+
+class RouteListModel(QAbstractListModel):
+    """
+    A list model of the sorted route IDs. The view only creates what is needed for the visible rows.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # A copy of the shown IDs, the route manager changes its list before the view can be notified
+        self._route_ids = []
+
+    def sync(self, route_ids):
+        """
+        Updates the rows to the sorted route IDs, only the rows of removed and added routes are changed.
+
+        Args:
+            route_ids (list): The sorted IDs of all routes.
+        """
+        if not self._route_ids or not route_ids:
+            self.beginResetModel()
+            self._route_ids = list(route_ids)
+            self.endResetModel()
+            return
+
+        shown_ids, new_ids = set(self._route_ids), set(route_ids)
+
+        for route_id in [route_id for route_id in self._route_ids if route_id not in new_ids]:
+            row = bisect.bisect_left(self._route_ids, route_id)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._route_ids[row]
+            self.endRemoveRows()
+
+        for route_id in route_ids:
+            if route_id not in shown_ids:
+                row = bisect.bisect_left(self._route_ids, route_id)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._route_ids.insert(row, route_id)
+                self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._route_ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid():
+            if role == Qt.DisplayRole:
+                return str(self._route_ids[index.row()])
+            if role == Qt.UserRole:
+                return self._route_ids[index.row()]  # The route ID as an int, so it isn't parsed from the text
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignHCenter
+
+        return None
 
 
 class Window(QWidget):
-    def __init__(self, carla_client, parent=None):
+    def __init__(self, carla_client, parent=None, use_opengl=True):
         super().__init__(parent)
         self.setWindowTitle("Route Creator")
         self.resize(800, 640)
@@ -693,66 +1147,158 @@ class Window(QWidget):
         self.save_file_button.setEnabled(False)
         button_layout_empty_save_load.addWidget(self.save_file_button)
 
-        separator = QFrame()
-        separator.setFrameShape(QFrame.HLine)
-        separator.setFrameShadow(QFrame.Sunken)
-        separator.setFixedHeight(10)
-        vertical_layout.addWidget(separator)
+        vertical_layout.addSpacing(10)
 
         self.add_route_button = QPushButton("Add Route")
         self.add_route_button.clicked.connect(self.on_add_route_button_click)
-        self.add_route_button.setEnabled(False)
         button_layout_add_remove.addWidget(self.add_route_button)
 
         self.remove_route_button = QPushButton("Remove Route")
         self.remove_route_button.clicked.connect(self.on_remove_route_button_click)
-        self.remove_route_button.setEnabled(False)
         button_layout_add_remove.addWidget(self.remove_route_button)
 
+        # The route buttons are enabled and disabled together through their container widget
+        self._route_actions_widget = QWidget()
+        button_layout_add_remove.setContentsMargins(0, 0, 0, 0)
+        self._route_actions_widget.setLayout(button_layout_add_remove)
+        self._route_actions_widget.setEnabled(False)
+
         self.label_selected_town = QLabel("No town selected")
         self.label_selected_town.setAlignment(Qt.AlignHCenter)
         vertical_layout.addWidget(self.label_selected_town)
 
-        # Adding a list widget to the vertical layout
-        self.items_list = QListWidget()
-        self.items_list.itemClicked.connect(self.on_list_item_clicked)
+        # Several label updates in quick succession, e.g. selecting routes with the arrow keys, only set the text once
+        self._label_timer = QTimer(self)
+        self._label_timer.setSingleShot(True)
+        self._label_timer.setInterval(16)
+        self._label_timer.timeout.connect(self._apply_map_name_label)
+
+        # The route IDs are shown in a list view, adding and removing routes only changes the rows of the model
+        self._route_model = RouteListModel(self)
+        self.items_list = QListView()
+        self.items_list.setModel(self._route_model)
+        self.items_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.items_list.setUniformItemSizes(True)
+        self.items_list.selectionModel().currentChanged.connect(self.on_current_route_changed)
         vertical_layout.addWidget(self.items_list)
-        vertical_layout.addLayout(button_layout_add_remove)
+        vertical_layout.addWidget(self._route_actions_widget)
 
-        font = self.items_list.font()
-        font.setPointSize(16)  # Set the font size to 16 points
-        self.items_list.setFont(font)
+        # One 16 point font shared by the routes list and the add location label
+        self._big_font = QFont(self.font())
+        self._big_font.setPointSize(16)
+        self.items_list.setFont(self._big_font)
 
         v_layout2 = QVBoxLayout()
         self.label_add_location = QLabel()
-        font2 = self.label_add_location.font()
         self.label_add_location.setStyleSheet("color: red;")
-        font2.setPointSize(16)  # Set the font size to 16 points
-        self.label_add_location.setFont(font2)
+        self.label_add_location.setFont(self._big_font)
+        # The messages never contain markup, so the label doesn't need to check for and lay out rich text
+        self.label_add_location.setTextFormat(Qt.PlainText)
 
         self.label_add_location.setAlignment(Qt.AlignHCenter)
-        v_layout2.addWidget(self.label_add_location)
-        self.label_add_location.setVisible(False)
 
-        self.canvas = Canvas(self.carla_client, parent=self, route_manager=self.route_manager)
+        # The label is swapped with an empty page instead of being shown and hidden. Its space stays reserved, so
+        # the canvas isn't resized and its map layer isn't redrawn whenever the message appears or disappears.
+        self.add_location_stack = QStackedWidget()
+        self.add_location_stack.addWidget(QWidget())
+        self.add_location_stack.addWidget(self.label_add_location)
+        self.add_location_stack.setFixedHeight(self.label_add_location.fontMetrics().height())
+        v_layout2.addWidget(self.add_location_stack)
+
+        # The OpenGL canvas is only used if an OpenGL context can be created, otherwise the raster engine draws
+        samples = probe_opengl_samples() if use_opengl else None
+        if samples is None:
+            self.canvas = RasterCanvas(self.carla_client, parent=self, route_manager=self.route_manager)
+        else:
+            self.canvas = Canvas(self.carla_client, samples=samples, parent=self, route_manager=self.route_manager)
         self.canvas.setEnabled(False)
 
-        v_layout2.addWidget(self.canvas)
-        v_layout2.setStretch(1, 1)  # Allowing the canvas to stretch and take up available space
-        main_layout.addLayout(v_layout2)
+        # Allowing the canvas to stretch and take up available space, the stretch is given when adding it
+        v_layout2.addWidget(self.canvas, 1)
+        main_layout.addLayout(v_layout2, 1)
 
         # Setting the main layout for the window
         self.setLayout(main_layout)
-        main_layout.setStretch(1, 1)  # Allowing the canvas to stretch and take up available space
 
         # Initialize panning variables
         self.last_mouse_pos = None
         self.panning = False
 
+        # The map data the canvas was last updated with
+        self._canvas_map_data = None
+        self._updating_routes_list = False
+
+        # Dialogs are created on first use and then reused
+        self._map_selection_dialog = None
+        self._loading_indicator = None
+        self._confirm_box = None
+
+    @contextlib.contextmanager
+    def _bulk_ui(self):
+        """
+        Disables the updates of the window and all its children for the duration of the context,
+        so that several changes to the widgets are painted together once at the end.
+        """
+        self.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.setUpdatesEnabled(True)
+            self.update()
+
+    def run_with_loading_indicator(self, message_text, task_function):
+        """
+        Runs the task function on a separate thread while the loading indicator window is shown.
+
+        Args:
+            message_text (str): The text message to display alongside the loading animation.
+            task_function (callable): The time-consuming task function to be executed.
+
+        Returns:
+            bool: True if the task succeeded. If it raised, the error is shown and False is returned, so that the
+                caller skips updating the UI with the results.
+        """
+        if self._loading_indicator is None:
+            self._loading_indicator = LoadingIndicatorWindow(None, message_text)
+
+        try:
+            self._loading_indicator.run_task(task_function, message_text)
+        except Exception as exception:
+            QMessageBox.critical(self, "Error", str(exception))
+            self.reset_ui_after_failed_task()
+            return False
+
+        return True
+
+    def reset_ui_after_failed_task(self):
+        """
+        Disables the route editing if a failed task left the route manager without a valid selected route, e.g. a
+        route file that could only be read partially. The routes that were loaded until the error are discarded.
+        """
+        if self.route_manager.selected_route_id in self.route_manager.routes:
+            return  # The task failed before it changed the routes
+
+        self.route_manager.routes.clear()
+        self.route_manager.sorted_ids.clear()
+        self.route_manager.selected_route_id = None
+
+        with self._bulk_ui():
+            self._route_actions_widget.setEnabled(False)
+            self.save_file_button.setEnabled(False)
+            self.canvas.setEnabled(False)
+            self._route_model.sync([])
+            self.canvas.update_selected_route(None)
+            self.label_selected_town.setText("No town selected")
+
     def show_yes_no_dialog(self, text):
-        reply = QMessageBox.question(self, "Confirmation", text, QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if self._confirm_box is None:
+            self._confirm_box = QMessageBox(
+                QMessageBox.Question, "Confirmation", "", QMessageBox.Yes | QMessageBox.No, self
+            )
+            self._confirm_box.setDefaultButton(QMessageBox.No)
 
-        return reply == QMessageBox.Yes
+        self._confirm_box.setText(text)
+        return self._confirm_box.exec_() == QMessageBox.Yes
 
     def center(self):
         frameGm = self.frameGeometry()
@@ -780,35 +1326,47 @@ class Window(QWidget):
             )
 
         if create_empty_file:
-            map_selection_window = MapSelectionDialog(self.carla_client, self)
+            if self._map_selection_dialog is None:
+                self._map_selection_dialog = MapSelectionDialog(self.carla_client, self)
 
-            map_name = map_selection_window.selected_map_name
+            map_name = self._map_selection_dialog.select_map()
             if map_name is not None:
-                LoadingIndicatorWindow(None, "Loading map...", lambda: self.route_manager.empty_routes(map_name))
+                if not self.run_with_loading_indicator(
+                    "Loading map...", lambda: self.route_manager.empty_routes(map_name)
+                ):
+                    return
 
-                self.update_map_name_and_route_length()
-                self.add_route_button.setEnabled(True)
-                self.save_file_button.setEnabled(True)
-                self.remove_route_button.setEnabled(True)
-                self.canvas.setEnabled(True)
-                self.update_routes_list()
-                self.canvas.reset_map_offset_and_scaling()
+                with self._bulk_ui():
+                    self.update_map_name_and_route_length()
+                    self._route_actions_widget.setEnabled(True)
+                    self.save_file_button.setEnabled(True)
+                    self.canvas.setEnabled(True)
+                    self.update_routes_list()
+                    self.canvas.reset_map_offset_and_scaling()
 
     def update_routes_list(self):
         routes, selected_route_id = self.route_manager.routes, self.route_manager.selected_route_id
-        self.items_list.clear()
 
-        for i, route_id in enumerate(sorted(routes.keys())):
-            item = QListWidgetItem(str(route_id))
-            item.setTextAlignment(Qt.AlignHCenter)
-            self.items_list.addItem(item)
+        route_ids = self.route_manager.sorted_ids
 
-            if route_id == selected_route_id:
-                self.items_list.setCurrentRow(i)
+        # Changing the rows and selecting the row of the selected route is not a selection by the user. The signals of
+        # the selection model are not blocked, since the view repaints the selected row through them
+        self._updating_routes_list = True
+        self._route_model.sync(route_ids)
 
-        selected_route = self.route_manager.routes[self.route_manager.selected_route_id]
-        self.canvas.update_selected_route(selected_route)
-        self.canvas.update_data_from_carla_client()
+        selected_row = bisect.bisect_left(route_ids, selected_route_id)
+        if self.items_list.currentIndex().row() != selected_row:
+            self.items_list.setCurrentIndex(self._route_model.index(selected_row))
+        self._updating_routes_list = False
+
+        selected_route = routes[selected_route_id]
+        if selected_route is not self.canvas.selected_route:
+            self.canvas.update_selected_route(selected_route)
+
+        # The map data only changes when another map was loaded
+        if self.carla_client.road_waypoints_np is not self._canvas_map_data:
+            self._canvas_map_data = self.carla_client.road_waypoints_np
+            self.canvas.update_data_from_carla_client()
 
     def closeEvent(self, event):
         if event.spontaneous():
@@ -834,17 +1392,18 @@ class Window(QWidget):
             options |= QFileDialog.DontUseCustomDirectoryIcons
             file_name, _ = QFileDialog.getOpenFileName(self, "Open File", "", "XML Files (*.xml)", options=options)
             if file_name:
-                LoadingIndicatorWindow(
-                    None, "Loading map...", lambda: self.route_manager.load_routes_from_file(file_name)
-                )
+                if not self.run_with_loading_indicator(
+                    "Loading map...", lambda: self.route_manager.load_routes_from_file(file_name)
+                ):
+                    return
 
-                self.update_map_name_and_route_length()
-                self.add_route_button.setEnabled(True)
-                self.save_file_button.setEnabled(True)
-                self.remove_route_button.setEnabled(True)
-                self.canvas.setEnabled(True)
-                self.update_routes_list()
-                self.canvas.reset_map_offset_and_scaling()
+                with self._bulk_ui():
+                    self.update_map_name_and_route_length()
+                    self._route_actions_widget.setEnabled(True)
+                    self.save_file_button.setEnabled(True)
+                    self.canvas.setEnabled(True)
+                    self.update_routes_list()
+                    self.canvas.reset_map_offset_and_scaling()
 
     def on_save_file_button_click(self):
         options = QFileDialog.Options()
@@ -854,16 +1413,31 @@ class Window(QWidget):
             self.route_manager.save_routes_to_file(file_name)
 
     def update_map_name_and_route_length(self):
-        selected_route = self.route_manager.routes[self.route_manager.selected_route_id]
-        self.label_selected_town.setText(
-            f"{selected_route.map_name} - {round(selected_route.route_length/1000.,3)} km"
-        )
+        self._label_timer.start()
+
+    def _apply_map_name_label(self):
+        selected_route = self.route_manager.routes.get(self.route_manager.selected_route_id)
+        if selected_route is None:
+            return
+
+        text = f"{selected_route.map_name} - {selected_route.formatted_length_km}"
+        if text != self.label_selected_town.text():
+            self.label_selected_town.setText(text)
 
-    def on_list_item_clicked(self, item):
-        self.route_manager.selected_route_id = int(item.text())  # 3.4809112548828125e-05
-        selected_route = self.route_manager.routes[self.route_manager.selected_route_id]  # 4.0531158447265625e-06
-        self.canvas.update_selected_route(selected_route)  # 0.00022840499877929688
-        # self.canvas.update() # 1.5974044799804688e-05
+    def on_current_route_changed(self, current, previous):
+        if self._updating_routes_list or not current.isValid():
+            return
+
+        route_id = current.data(Qt.UserRole)
+        if route_id == self.route_manager.selected_route_id:
+            return  # Selecting the selected route again changes nothing
+
+        self.route_manager.selected_route_id = route_id
+        selected_route = self.route_manager.routes[route_id]
+
+        # Only the route reference changes, the map data and the list stay the same
+        self.canvas.update_selected_route(selected_route)
+        self.canvas.update()
 
         self.update_map_name_and_route_length()
 
@@ -875,11 +1449,17 @@ if __name__ == "__main__":
     parser.add_argument(
         "--map-data-dir", type=str, default="carla_map_data", help="The path of the directory with the map data"
     )
+    parser.add_argument(
+        "--no-opengl", action="store_true", help="Draw the map with the raster engine instead of with OpenGL"
+    )
     args = parser.parse_args()
 
     carla_client = CarlaClient(args.host, args.port, args.map_data_dir)
 
+    # No widgets of the window overlap (the canvas and the list are in separate layouts), so Qt can skip
+    # subtracting the opaque sibling regions from every repainted region
+    os.environ.setdefault("QT_NO_SUBTRACTOPAQUESIBLINGS", "1")
     app = QApplication(sys.argv)
-    main_window = Window(carla_client)
+    main_window = Window(carla_client, use_opengl=not args.no_opengl)
     main_window.show()
     sys.exit(app.exec_())